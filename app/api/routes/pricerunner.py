@@ -4,13 +4,30 @@ Serves category hierarchy and product listings from pricerunner_db.
 """
 
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import Response
+from bson import ObjectId
+from pymongo.errors import OperationFailure
+import asyncio
+import json
 import logging
 import re
 import math
 
-from app.database import pricerunner_db, taxonomy_db
-
-router = APIRouter(prefix="/api/pr", tags=["pricerunner"])
+from app.config import settings
+from app.database import pricerunner_db, taxonomy_db, redis_client
+from app.tasks.pr_price_histograms import get_price_histogram, rebuild_price_histograms_since
+from app.tasks.pr_related import get_pr_related_ids
+from app.tasks.pricerunner_migrations import BRAND_TRIM_CHARS, SYNC_EDITED_KEY, normalize_brand, parse_price
+from app.utils.cache import bump_data_version
+from app.utils.counts import count_matching
+from app.utils.cursors import decode_cursor, encode_cursor, keyset_match
+from app.utils.facet_cache import get_facets
+from app.utils.http_cache import PROVISIONAL_CACHE_CONTROL
+from app.utils.listing_snapshot import get_listing_snapshot, refresh_listing_snapshot
+from app.utils.singleflight import SingleFlight
+from app.utils.responses import FastJSONResponse, STREAM_THRESHOLD, dumps, stream_json
+
+router = APIRouter(prefix="/api/pr", tags=["pricerunner"], default_response_class=FastJSONResponse)
 logger = logging.getLogger(__name__)
 
 # Collections
@@ -56,8 +73,6 @@ PRODUCT_TYPE_ICONS = {
 
 async def ensure_indexes():
     """Create indexes for efficient querying (idempotent)."""
-    from pymongo.errors import OperationFailure
-
     async def _safe_index(coll, *args, **kwargs):
         try:
             await coll.create_index(*args, **kwargs)
@@ -65,7 +80,14 @@ async def ensure_indexes():
             pass  # index already exists with different options
 
     await _safe_index(listing_items, "product_type")
+    await _safe_index(listing_items, "product_id")
     await _safe_index(listing_items, "category_url")
+    # Trailing _id matches the keyset tiebreaker so cursor pages are index-ordered
+    await _safe_index(listing_items, [("product_type", 1), ("category_url", 1), ("price_num", 1), ("_id", 1)])
+    await _safe_index(listing_items, [("product_type", 1), ("price_num", 1), ("_id", 1)])
+    await _safe_index(listing_items, [("product_type", 1), ("num_stores", -1), ("_id", -1)])
+    await _safe_index(listing_items, [("product_type", 1), ("category_url", 1), ("brand", 1)])
+    await _safe_index(listing_items, [("product_type", 1), ("brand", 1)])
     await _safe_index(listing_items, [("product_name", "text"), ("description", "text")])
     await _safe_index(category_items, "product_type")
     await _safe_index(category_items, "category_url")
@@ -73,31 +95,160 @@ async def ensure_indexes():
     await _safe_index(canonical_categories, "slug")
 
 
+PR_FINGERPRINT_KEY = "pr_fingerprint:{collection}"
+
+
+async def _collection_fingerprint(coll) -> str:
+    """Cheap change marker: metadata count plus the newest _id."""
+    count = await coll.estimated_document_count()
+    last = await coll.find_one({}, {"_id": 1}, sort=[("_id", -1)])
+    return f"{count}:{last['_id'] if last else ''}"
+
+
+def _fingerprint_last_id(fingerprint: str | None) -> ObjectId | None:
+    """Newest _id recorded in a fingerprint, if any."""
+    last = (fingerprint or "").partition(":")[2]
+    return ObjectId(last) if ObjectId.is_valid(last) else None
+
+
+PR_CHANGES_KEY = "pr_changes:{collection}"  # change-stream events not yet folded in
+CHANGE_STREAM_UNSUPPORTED = 40573  # $changeStream on a standalone server
+
+
+async def watch_collection_changes():
+    """
+    Count writes to listing_items and category_items from change streams, so
+    in-place edits (prices, store counts, renames) that leave the fingerprint
+    untouched still trigger a refresh. Listings updated in place are also
+    queued for the derived-field sync. Runs for the app's lifetime; on a
+    standalone server (no change streams) it logs once and only the
+    fingerprint is used.
+    """
+    async def watch(coll, edited_key: str | None = None):
+        key = PR_CHANGES_KEY.format(collection=coll.name)
+        backoff = 5
+        while True:
+            try:
+                async with coll.watch([{"$project": {"operationType": 1, "documentKey": 1}}]) as stream:
+                    async for event in stream:
+                        await redis_client.incr(key)
+                        if edited_key and event["operationType"] in ("update", "replace"):
+                            await redis_client.sadd(edited_key, str(event["documentKey"]["_id"]))
+                        backoff = 5
+            except OperationFailure as e:
+                if e.code == CHANGE_STREAM_UNSUPPORTED:
+                    logger.warning(f"Change streams unavailable; in-place edits to {coll.name} go undetected")
+                    return
+                logger.error(f"Change stream on {coll.name} failed: {e}")
+            except Exception as e:
+                logger.error(f"Change stream on {coll.name} failed: {e}")
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 300)
+
+    await asyncio.gather(watch(listing_items, SYNC_EDITED_KEY), watch(category_items))
+
+
+async def refresh_data_version() -> bool:
+    """
+    Rebuild the derived read models and bump the "pricerunner" data version
+    when listing_items or category_items changed since the last check
+    (scheduled). A collection counts as changed when its fingerprint moved or
+    the change stream saw writes. The version is bumped only once the read
+    models are rebuilt, so a new ETag never covers old data, and the new
+    state is only recorded after that, so a failed run is retried.
+    """
+    pending = {}
+    for coll in (listing_items, category_items):
+        fingerprint = await _collection_fingerprint(coll)
+        edits = int(await redis_client.get(PR_CHANGES_KEY.format(collection=coll.name)) or 0)
+        previous = await redis_client.get(PR_FINGERPRINT_KEY.format(collection=coll.name))
+        if previous != fingerprint or edits:
+            pending[coll.name] = (fingerprint, edits, previous)
+    if not pending:
+        return False
+
+    if category_items.name in pending:
+        # A fresh generation per rebuild, so in-place edits (same fingerprint) get a new stamp too
+        generation = await redis_client.incr(CATEGORY_TREE_GENERATION_KEY)
+        await rebuild_category_trees(f"{pending[category_items.name][0]}:{generation}")
+    if listing_items.name in pending:
+        fingerprint, edits, previous = pending[listing_items.name]
+        await rollup_product_type_counts()
+        # The incremental refreshes only see new listings; edits need a full pass
+        await refresh_homepage_lists(full=bool(edits))
+        await rebuild_price_histograms_since(None if edits else _fingerprint_last_id(previous))
+        if settings.PR_BROWSE_SNAPSHOT:
+            # No newer _id with a moved fingerprint means deletions: rebuild rather than append
+            appended = _fingerprint_last_id(fingerprint) != _fingerprint_last_id(previous)
+            await refresh_listing_snapshot(_format_product, full=bool(edits) or not appended)
+    await bump_data_version("pricerunner")
+
+    for name, (fingerprint, edits, _) in pending.items():
+        await redis_client.set(PR_FINGERPRINT_KEY.format(collection=name), fingerprint)
+        if edits:
+            # Events that arrived meanwhile stay counted for the next run
+            await redis_client.decrby(PR_CHANGES_KEY.format(collection=name), edits)
+    return True
+
+
 # ---------------------------------------------------------------------------
 # GET /api/pr/product-types — 14 product type groups with product counts
 # ---------------------------------------------------------------------------
 
-@router.get("/product-types")
-async def get_product_types():
-    """Return all 14 product type groups with listing counts and a sample image."""
+PRODUCT_TYPE_SUMMARY_KEY = "pr_product_types"  # hash: product_type -> {"count", "image"}
+
+
+async def _count_product_types() -> dict[str, dict]:
+    """Listing count and a sample image per product type, straight from listing_items."""
     pipeline = [
         {"$group": {
             "_id": "$product_type",
             "count": {"$sum": 1},
             "sample_image": {"$first": "$main_image"},
         }},
-        {"$sort": {"count": -1}},
     ]
-    cursor = listing_items.aggregate(pipeline)
+    summary = {}
+    async for doc in listing_items.aggregate(pipeline):
+        if doc["_id"]:
+            summary[doc["_id"]] = {"count": doc["count"], "image": doc.get("sample_image")}
+    return summary
+
+
+async def rollup_product_type_counts() -> dict[str, dict]:
+    """
+    Recount listings per product type into the summary hash. Runs when the
+    listing_items fingerprint changes, so requests never scan the collection.
+    """
+    summary = await _count_product_types()
+    pipe = redis_client.pipeline(transaction=True)
+    pipe.delete(PRODUCT_TYPE_SUMMARY_KEY)
+    if summary:
+        pipe.hset(PRODUCT_TYPE_SUMMARY_KEY, mapping={pt: json.dumps(v) for pt, v in summary.items()})
+    await pipe.execute()
+    return summary
+
+
+@router.get("/product-types")
+async def get_product_types():
+    """Return all 14 product type groups with listing counts and a sample image."""
+    try:
+        stored = await redis_client.hgetall(PRODUCT_TYPE_SUMMARY_KEY)
+        if stored:
+            summary = {pt: json.loads(v) for pt, v in stored.items()}
+        else:
+            summary = await rollup_product_type_counts()
+    except Exception as e:
+        logger.warning(f"Product type summary unavailable, counting from MongoDB: {e}")
+        summary = await _count_product_types()
+
     results = []
-    async for doc in cursor:
-        pt = doc["_id"]
+    for pt, entry in sorted(summary.items(), key=lambda item: item[1]["count"], reverse=True):
         results.append({
             "id": pt,
             "label": PRODUCT_TYPE_LABELS.get(pt, pt.replace("_", " ").title()),
             "icon": PRODUCT_TYPE_ICONS.get(pt, "📦"),
-            "productCount": doc["count"],
-            "image": doc.get("sample_image"),
+            "productCount": entry["count"],
+            "image": entry.get("image"),
         })
     return {"productTypes": results}
 
@@ -160,12 +311,27 @@ def _slugify(text: str) -> str:
     return slug.strip("-")
 
 
-@router.get("/categories/{product_type}/tree")
-async def get_category_tree(product_type: str):
-    """Return the category tree for a product type."""
-    if product_type not in PRODUCT_TYPE_LABELS:
-        raise HTTPException(status_code=404, detail="Unknown product type")
+CATEGORY_TREE_KEY = "pr_category_tree:{product_type}"  # hash: stamp, body
+CATEGORY_TREE_STAMP_KEY = "pr_category_tree:stamp"       # stamp of the current trees
+CATEGORY_TREE_GENERATION_KEY = "pr_category_tree:generation"
+
+# product_type -> (tree stamp, encoded response body)
+_category_trees: dict[str, tuple[str, bytes]] = {}
 
+
+async def _category_tree_stamp() -> str:
+    """
+    Version stamp for the trees: the category_items fingerprint plus a
+    generation bumped whenever category_items changes, including in-place
+    edits (renames, image changes) that leave the fingerprint untouched.
+    Falls back to the bare fingerprint before the first rebuild.
+    """
+    stamp = await redis_client.get(CATEGORY_TREE_STAMP_KEY)
+    return stamp if stamp is not None else await _collection_fingerprint(category_items)
+
+
+async def _encode_category_tree(product_type: str) -> bytes:
+    """Build one product type's tree from category_items and encode the response body."""
     cats = []
     cursor = category_items.find(
         {"product_type": product_type, "is_leaf": True},
@@ -184,17 +350,84 @@ async def get_category_tree(product_type: str):
         non_leaf_images[doc["category_name"]] = doc["image_url"]
 
     tree = _build_tree(cats, non_leaf_images)
-    return {
+    return dumps({
         "productType": product_type,
         "label": PRODUCT_TYPE_LABELS[product_type],
         "tree": tree,
-    }
+    })
+
+
+async def _build_category_tree(product_type: str, stamp: str) -> bytes:
+    """Build, encode and store one product type's tree under `stamp`."""
+    body = await _encode_category_tree(product_type)
+    await redis_client.hset(
+        CATEGORY_TREE_KEY.format(product_type=product_type),
+        mapping={"stamp": stamp, "body": body.decode("utf-8")},
+    )
+    _category_trees[product_type] = (stamp, body)
+    return body
+
+
+async def rebuild_category_trees(stamp: str | None = None):
+    """Rebuild all product type trees (called when category_items changes)."""
+    stamp = stamp or await _category_tree_stamp()
+    # Published first: a request meanwhile builds its type under the new stamp, never the old one
+    await redis_client.set(CATEGORY_TREE_STAMP_KEY, stamp)
+    for product_type in PRODUCT_TYPE_LABELS:
+        try:
+            await _build_category_tree(product_type, stamp)
+        except Exception as e:
+            logger.error(f"Failed to rebuild category tree for {product_type}: {e}")
+    logger.info(f"Rebuilt {len(PRODUCT_TYPE_LABELS)} category trees")
+
+
+@router.get("/categories/{product_type}/tree")
+async def get_category_tree(product_type: str):
+    """Return the category tree for a product type (pre-encoded, rebuilt on change)."""
+    if product_type not in PRODUCT_TYPE_LABELS:
+        raise HTTPException(status_code=404, detail="Unknown product type")
+
+    try:
+        stamp = await _category_tree_stamp()
+        local = _category_trees.get(product_type)
+        if local and local[0] == stamp:
+            return Response(content=local[1], media_type="application/json")
+
+        # Another worker may already have rebuilt it
+        stored = await redis_client.hgetall(CATEGORY_TREE_KEY.format(product_type=product_type))
+    except Exception as e:
+        logger.warning(f"Category tree cache unavailable, building from MongoDB: {e}")
+        return Response(content=await _encode_category_tree(product_type), media_type="application/json")
+
+    if stored.get("stamp") == stamp and stored.get("body"):
+        body = stored["body"].encode("utf-8")
+        _category_trees[product_type] = (stamp, body)
+    else:
+        body = await _build_category_tree(product_type, stamp)
+    return Response(content=body, media_type="application/json")
 
 
 # ---------------------------------------------------------------------------
 # GET /api/pr/categories/{product_type}/products — paginated product listings
 # ---------------------------------------------------------------------------
 
+# sort param -> (field, direction)
+SORT_FIELDS = {
+    "price-asc": ("price_num", 1),
+    "price-desc": ("price_num", -1),
+    "name-asc": ("product_name", 1),
+    "stores-desc": ("num_stores", -1),
+}
+
+
+async def rebuild_browse_snapshot():
+    """Build the browse snapshot from scratch (at startup when enabled; refresh_data_version keeps it current)."""
+    try:
+        await refresh_listing_snapshot(_format_product, full=True)
+    except Exception as e:
+        logger.error(f"Browse snapshot build failed: {e}")
+
+
 @router.get("/categories/{product_type}/products")
 async def get_products(
     product_type: str,
@@ -202,110 +435,207 @@ async def get_products(
     sort: str = Query("price-asc", description="Sort: price-asc, price-desc, name-asc, stores-desc"),
     page: int = Query(1, ge=1),
     limit: int = Query(24, ge=1, le=100),
+    cursor: str | None = Query(None, description="Opaque nextCursor from the previous page (overrides page)"),
     min_price: float | None = Query(None, ge=0),
     max_price: float | None = Query(None, ge=0),
-    q: str | None = Query(None, description="Text search within product names"),
-    brand: str | None = Query(None, description="Filter by brand (first word of product name)"),
+    q: str | None = Query(None, description="Text search (every whole word must match, partial-word fallback)"),
+    brand: str | None = Query(None, description="Filter by brand (first word of product name, any case)"),
 ):
-    """Return paginated products for a product type, optionally filtered by category."""
+    """
+    Return paginated products for a product type, optionally filtered by category.
+    `page` works for shallow pages; `cursor` pages by keyset at constant cost.
+    """
     if product_type not in PRODUCT_TYPE_LABELS:
         raise HTTPException(status_code=404, detail="Unknown product type")
 
+    # Sort (with _id tiebreaker so keyset cursors are stable)
+    field, direction = SORT_FIELDS.get(sort, SORT_FIELDS["price-asc"])
+    skip = (page - 1) * limit
+
+    cursor_match = keyset_match(field, direction, cursor) if cursor else None  # 400s on a bad cursor
+    after = decode_cursor(cursor)["id"] if cursor else None
+
+    # In-memory snapshot answers plain filter/sort/page browsing without touching MongoDB,
+    # cursor pages included, so a listing's pages all come from the same data
+    snapshot = get_listing_snapshot()
+    if snapshot is not None and not q and (after is None or snapshot.has_listing(after)):
+        result = snapshot.browse(
+            product_type, category_url, brand, min_price, max_price, field, direction, skip, limit, after
+        )
+        last = result["last"]
+        return FastJSONResponse({
+            "products": result["products"],
+            "total": result["total"],
+            "totalApproximate": False,
+            "page": page,
+            "totalPages": math.ceil(result["total"] / limit) if result["total"] > 0 else 1,
+            "productType": product_type,
+            "label": PRODUCT_TYPE_LABELS[product_type],
+            "brands": result["brands"],
+            "priceRange": result["priceRange"],
+            "nextCursor": encode_cursor({"f": field, **last}) if last else None,
+        })
+
     query: dict = {"product_type": product_type}
 
     if category_url:
         query["category_url"] = category_url
 
     if q:
-        query["product_name"] = {"$regex": re.escape(q), "$options": "i"}
+        query["$text"] = {"$search": _all_terms_search(q)}
 
-    if brand:
-        # Brand is the first word of product_name — match case-insensitively
-        query.setdefault("product_name", {})
-        if isinstance(query["product_name"], dict):
-            query["product_name"]["$regex"] = f"^{re.escape(brand)}\\b"
-            query["product_name"]["$options"] = "i"
-        else:
-            query["product_name"] = {"$regex": f"^{re.escape(brand)}\\b", "$options": "i"}
-
-    # Sort mapping
-    sort_map = {
-        "price-asc": [("_sort_price", 1)],
-        "price-desc": [("_sort_price", -1)],
-        "name-asc": [("product_name", 1)],
-        "stores-desc": [("num_stores", -1)],
-    }
+    # Facets (total, brands, price range) depend only on the filters above
+    facets, stale = await _facets_for(product_type, category_url, q, query, "all-terms")
+    if q and facets["total"] == 0:
+        # Partial words ("sams") are not text-index terms; fall back to a substring match
+        del query["$text"]
+        query["product_name"] = _partial_name_match(q)
+        facets, stale = await _facets_for(product_type, category_url, q, query, "partial")
 
-    skip = (page - 1) * limit
-
-    # Use aggregation pipeline for price conversion and filtering
-    pipeline: list[dict] = [
-        {"$match": query},
-        {"$addFields": {
-            "_sort_price": {
-                "$convert": {"input": "$price", "to": "double", "onError": 0, "onNull": 0}
-            }
-        }},
-    ]
+    if brand:
+        # Normalized at ingest (see normalize_brand), so this is an indexed equality match
+        query["brand"] = normalize_brand(brand)
 
-    # Price range filter (after conversion)
+    # Price range filter on the numeric copy of price (indexed with product_type/category_url)
     if min_price is not None or max_price is not None:
         price_filter: dict = {}
         if min_price is not None:
             price_filter["$gte"] = min_price
         if max_price is not None:
             price_filter["$lte"] = max_price
-        pipeline.append({"$match": {"_sort_price": price_filter}})
+        query["price_num"] = price_filter
+
+    # Only brand/price filters need their own count; otherwise the cached facet total
+    # applies, and is approximate while a stale entry is being refreshed
+    if brand or min_price is not None or max_price is not None:
+        total, approximate = await count_matching(listing_items, query, "pricerunner")
+    else:
+        total, approximate = facets["total"], stale
+
+    pipeline: list[dict] = [{"$match": query}]
+    if cursor_match:
+        pipeline.append({"$match": cursor_match})
+    pipeline.append({"$sort": {field: direction, "_id": direction}})
+    if not cursor:
+        pipeline.append({"$skip": skip})
+    pipeline.append({"$limit": limit})
 
-    # Count pipeline (before sort/skip/limit)
-    count_pipeline = pipeline + [{"$count": "total"}]
-    count_cursor = listing_items.aggregate(count_pipeline)
-    count_result = await count_cursor.to_list(1)
-    total = count_result[0]["total"] if count_result else 0
+    head = {
+        "total": total,
+        "totalApproximate": approximate,
+        "page": page,
+        "totalPages": math.ceil(total / limit) if total > 0 else 1,
+        "productType": product_type,
+        "label": PRODUCT_TYPE_LABELS[product_type],
+        "brands": facets["brands"],
+        "priceRange": facets["priceRange"],
+    }
+    # Stale facets and approximate counts are refreshed in the background
+    return await _paged_response(
+        head, listing_items.aggregate(pipeline), limit, field, provisional=stale or approximate
+    )
 
-    # Brands aggregation — top brands for this filter set (before brand filter)
-    brand_base_query: dict = {"product_type": product_type}
-    if category_url:
-        brand_base_query["category_url"] = category_url
-    if q:
-        brand_base_query["product_name"] = {"$regex": re.escape(q), "$options": "i"}
-    brand_pipeline = [
-        {"$match": brand_base_query},
-        {"$addFields": {
-            "_brand": {"$arrayElemAt": [{"$split": ["$product_name", " "]}, 0]}
+
+def _brand_label(product_name: str | None, brand_key: str) -> str:
+    """Brand as written in a sample product name (the filter normalizes it again)."""
+    words = (product_name or "").split()
+    return words[0].strip(BRAND_TRIM_CHARS) if words else brand_key
+
+
+async def _facets_for(
+    product_type: str, category_url: str | None, q: str | None, query: dict, match: str
+) -> tuple[dict, bool]:
+    base_query = dict(query)  # snapshot: the caller keeps adding page filters to `query`
+    return await get_facets(product_type, category_url, q, lambda: _compute_facets(base_query), match=match)
+
+
+async def _compute_facets(base_query: dict) -> dict:
+    """Total, top brands and price range for a filter set in one $facet round trip."""
+    pipeline = [
+        {"$match": base_query},
+        {"$facet": {
+            "total": [{"$count": "n"}],
+            "brands": [
+                {"$group": {"_id": "$brand", "name": {"$first": "$product_name"}, "count": {"$sum": 1}}},
+                {"$sort": {"count": -1}},
+                {"$limit": 30},
+            ],
+            "price": [
+                {"$match": {"price_num": {"$gt": 0}}},
+                {"$group": {"_id": None, "min": {"$min": "$price_num"}, "max": {"$max": "$price_num"}}},
+            ],
         }},
-        {"$group": {"_id": "$_brand", "count": {"$sum": 1}}},
-        {"$sort": {"count": -1}},
-        {"$limit": 30},
     ]
-    brands = []
-    async for b in listing_items.aggregate(brand_pipeline):
-        if b["_id"]:
-            brands.append({"name": b["_id"], "count": b["count"]})
-
-    # Sort
-    sort_spec = sort_map.get(sort, sort_map["price-asc"])
-    pipeline.append({"$sort": dict(sort_spec)})
-    pipeline.append({"$skip": skip})
-    pipeline.append({"$limit": limit})
-    pipeline.append({"$project": {"_sort_price": 0}})
+    result = (await listing_items.aggregate(pipeline).to_list(1))[0]
+    price = result["price"][0] if result["price"] else None
+    return {
+        "total": result["total"][0]["n"] if result["total"] else 0,
+        "brands": [
+            {"name": _brand_label(b["name"], b["_id"]), "count": b["count"]}
+            for b in result["brands"] if b["_id"]
+        ],
+        "priceRange": {"min": price["min"], "max": price["max"]} if price else None,
+    }
 
-    cursor = listing_items.aggregate(pipeline)
-    products = []
-    async for doc in cursor:
-        products.append(_format_product(doc))
 
+# ---------------------------------------------------------------------------
+# GET /api/pr/categories/{product_type}/price-histogram — price slider data
+# ---------------------------------------------------------------------------
+
+@router.get("/categories/{product_type}/price-histogram")
+async def get_price_histogram_for_filter(
+    product_type: str,
+    category_url: str | None = Query(None, description="Filter by specific category_url"),
+):
+    """Return the precomputed price histogram and percentiles for a browse filter."""
+    if product_type not in PRODUCT_TYPE_LABELS:
+        raise HTTPException(status_code=404, detail="Unknown product type")
+
+    histogram = await get_price_histogram(product_type, category_url)
     return {
-        "products": products,
-        "total": total,
-        "page": page,
-        "totalPages": math.ceil(total / limit) if total > 0 else 1,
         "productType": product_type,
-        "label": PRODUCT_TYPE_LABELS[product_type],
-        "brands": brands,
+        "categoryUrl": category_url,
+        "histogram": histogram,
     }
 
 
+# ---------------------------------------------------------------------------
+# GET /api/pr/products?ids= — bulk lookup for favourites / compare panels
+# ---------------------------------------------------------------------------
+
+MAX_BULK_IDS = 100
+
+
+@router.get("/products")
+async def get_products_bulk(
+    ids: str = Query(..., description=f"Comma-separated product ids (max {MAX_BULK_IDS})"),
+):
+    """
+    Return several products in one indexed $in query. `products` follows the
+    request order with null for unknown ids, which are also listed in `missing`.
+    """
+    requested = [pid.strip() for pid in ids.split(",") if pid.strip()]
+    if not requested:
+        raise HTTPException(status_code=400, detail="No product ids given")
+    if len(requested) > MAX_BULK_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_IDS} ids per request")
+
+    found = {}
+    async for doc in listing_items.find({"product_id": {"$in": list(dict.fromkeys(requested))}}):
+        found.setdefault(doc["product_id"], doc)
+
+    products = []
+    missing = []
+    for pid in requested:
+        doc = found.get(pid)
+        if doc is None:
+            missing.append(pid)
+            products.append(None)
+        else:
+            products.append(_format_product(doc))
+    return {"products": products, "missing": missing}
+
+
 # ---------------------------------------------------------------------------
 # GET /api/pr/product/{product_id} — single product detail
 # ---------------------------------------------------------------------------
@@ -332,7 +662,15 @@ async def get_related_products(
     product_id: str,
     limit: int = Query(8, ge=1, le=24),
 ):
-    """Return related products from the same category."""
+    """Return text-similar products (precomputed nightly), else products from the same category."""
+    related_ids = await get_pr_related_ids(product_id)
+    if related_ids:
+        related_ids = related_ids[:limit]
+        by_id = {}
+        async for d in listing_items.find({"product_id": {"$in": related_ids}}):
+            by_id[d["product_id"]] = d
+        return {"products": [_format_product(by_id[pid]) for pid in related_ids if pid in by_id]}
+
     doc = await listing_items.find_one({"product_id": product_id})
     if not doc:
         raise HTTPException(status_code=404, detail="Product not found")
@@ -353,35 +691,94 @@ async def get_related_products(
 # GET /api/pr/homepage — featured products for the homepage
 # ---------------------------------------------------------------------------
 
+HOMEPAGE_KEY = "pr_homepage:{kind}:{scope}"       # JSON list of formatted products
+HOMEPAGE_WATERMARK_KEY = "pr_homepage:watermark"   # newest listing _id already folded in
+HOMEPAGE_MAX = 48
+HOMEPAGE_GLOBAL_SCOPE = "all"
+
+_homepage_refresh = SingleFlight()
+
+# kind -> (match, sort field, direction, formatted key used when merging scopes)
+HOMEPAGE_LISTS = {
+    "deals": ({"main_image": {"$ne": None}, "price_num": {"$gt": 0}}, "price_num", 1, "price"),
+    "trending": ({"main_image": {"$ne": None}, "num_stores": {"$gt": 1}}, "num_stores", -1, "numStores"),
+}
+
+
+async def _top_listings(kind: str, product_type: str | None, limit: int = HOMEPAGE_MAX) -> list[dict]:
+    """Top listings of one kind for a product type, or across all types when None."""
+    match, field, direction, _ = HOMEPAGE_LISTS[kind]
+    query = {"product_type": product_type, **match} if product_type else match
+    docs = listing_items.find(query).sort(field, direction).limit(limit)
+    return [_format_product(doc) async for doc in docs]
+
+
+async def refresh_homepage_lists(full: bool = False):
+    """
+    Recompute homepage deals/trending for the product types with listings
+    newer than the watermark (all types when `full`), then merge the global
+    lists from the per-type ones. Each per-type query is an index-ordered
+    top-N read on (product_type, price_num) or (product_type, num_stores).
+    """
+    watermark = await redis_client.get(HOMEPAGE_WATERMARK_KEY)
+    newest = await listing_items.find_one({}, {"_id": 1}, sort=[("_id", -1)])
+    if full or not watermark:
+        product_types = list(PRODUCT_TYPE_LABELS)
+    else:
+        product_types = await listing_items.distinct("product_type", {"_id": {"$gt": ObjectId(watermark)}})
+        product_types = [pt for pt in product_types if pt in PRODUCT_TYPE_LABELS]
+
+    if product_types:
+        pipe = redis_client.pipeline(transaction=False)
+        for product_type in product_types:
+            for kind in HOMEPAGE_LISTS:
+                products = await _top_listings(kind, product_type)
+                pipe.set(HOMEPAGE_KEY.format(kind=kind, scope=product_type), json.dumps(products))
+        await pipe.execute()
+
+        # Global top-N is the top-N of the union of per-type top-Ns
+        for kind, (_, _, direction, merge_key) in HOMEPAGE_LISTS.items():
+            keys = [HOMEPAGE_KEY.format(kind=kind, scope=pt) for pt in PRODUCT_TYPE_LABELS]
+            merged = []
+            for raw in await redis_client.mget(keys):
+                if raw:
+                    merged.extend(json.loads(raw))
+            merged.sort(key=lambda product: product.get(merge_key) or 0, reverse=direction == -1)
+            await redis_client.set(
+                HOMEPAGE_KEY.format(kind=kind, scope=HOMEPAGE_GLOBAL_SCOPE),
+                json.dumps(merged[:HOMEPAGE_MAX]),
+            )
+        logger.info(f"Refreshed homepage lists for {len(product_types)} product types")
+
+    if newest:
+        await redis_client.set(HOMEPAGE_WATERMARK_KEY, str(newest["_id"]))
+
+
+async def refresh_all_homepage_lists():
+    """Full recompute (scheduled), which also picks up in-place price/store changes."""
+    await refresh_homepage_lists(full=True)
+
+
 @router.get("/homepage")
 async def get_homepage_products(
-    limit: int = Query(12, ge=1, le=48),
+    limit: int = Query(12, ge=1, le=HOMEPAGE_MAX),
+    product_type: str | None = Query(None, description="Limit deals/trending to one product type"),
 ):
     """Return products for the homepage: deals (lowest-priced with images) and trending (most stores)."""
-    # Deals: products with images, sorted by lowest price
-    deals_pipeline = [
-        {"$match": {"main_image": {"$ne": None}}},
-        {"$addFields": {
-            "_sort_price": {"$convert": {"input": "$price", "to": "double", "onError": 0, "onNull": 0}},
-        }},
-        {"$match": {"_sort_price": {"$gt": 0}}},
-        {"$sort": {"_sort_price": 1}},
-        {"$limit": limit},
-        {"$project": {"_sort_price": 0}},
-    ]
-    deals = []
-    async for doc in listing_items.aggregate(deals_pipeline):
-        deals.append(_format_product(doc))
-
-    # Trending: most stores, with images
-    trending_pipeline = [
-        {"$match": {"main_image": {"$ne": None}, "num_stores": {"$gt": 1}}},
-        {"$sort": {"num_stores": -1}},
-        {"$limit": limit},
-    ]
-    trending = []
-    async for doc in listing_items.aggregate(trending_pipeline):
-        trending.append(_format_product(doc))
+    if product_type is not None and product_type not in PRODUCT_TYPE_LABELS:
+        raise HTTPException(status_code=404, detail="Unknown product type")
+    scope = product_type or HOMEPAGE_GLOBAL_SCOPE
+
+    keys = [HOMEPAGE_KEY.format(kind=kind, scope=scope) for kind in HOMEPAGE_LISTS]
+    try:
+        stored = await redis_client.mget(keys)
+        if any(raw is None for raw in stored):
+            await _homepage_refresh.do("full", refresh_all_homepage_lists)
+            stored = await redis_client.mget(keys)
+        deals, trending = (json.loads(raw)[:limit] if raw else [] for raw in stored)
+    except Exception as e:
+        logger.warning(f"Homepage lists unavailable, querying MongoDB: {e}")
+        deals, trending = [await _top_listings(kind, product_type, limit) for kind in HOMEPAGE_LISTS]
 
     total = await listing_items.estimated_document_count()
 
@@ -402,40 +799,115 @@ async def search_products(
     product_type: str | None = Query(None),
     page: int = Query(1, ge=1),
     limit: int = Query(24, ge=1, le=100),
+    cursor: str | None = Query(None, description="Opaque nextCursor from the previous page (overrides page)"),
 ):
-    """Full-text search across listing items."""
-    query: dict = {"product_name": {"$regex": re.escape(q), "$options": "i"}}
-    if product_type and product_type in PRODUCT_TYPE_LABELS:
-        query["product_type"] = product_type
-
-    total = await listing_items.count_documents(query)
+    """
+    Full-text search across listing items, ranked by text-index relevance.
+    Queries with no whole-word match (e.g. partial words) fall back to a
+    substring match on product_name, ordered by name.
+    """
+    type_filter = {"product_type": product_type} if product_type in PRODUCT_TYPE_LABELS else {}
     skip = (page - 1) * limit
 
-    cursor = listing_items.find(query).sort("product_name", 1).skip(skip).limit(limit)
-    products = []
-    async for doc in cursor:
-        products.append(_format_product(doc))
+    query: dict = {"$text": {"$search": q}, **type_filter}
+    total, approximate = await count_matching(listing_items, query, "pricerunner")
+    match_mode = "text"
+    if total == 0:
+        query = {"product_name": _partial_name_match(q), **type_filter}
+        total, approximate = await count_matching(listing_items, query, "pricerunner")
+        match_mode = "partial"
 
-    return {
-        "products": products,
+    head = {
         "total": total,
+        "totalApproximate": approximate,
         "page": page,
         "totalPages": math.ceil(total / limit) if total > 0 else 1,
         "query": q,
+        "matchMode": match_mode,
     }
 
+    if match_mode == "text":
+        # Relevance order can't be keyset-paged, so the cursor carries the offset
+        offset = _cursor_offset(cursor, "score") if cursor else skip
+        docs = (
+            listing_items.find(query, {"score": {"$meta": "textScore"}})
+            .sort([("score", {"$meta": "textScore"}), ("_id", 1)])
+            .skip(offset)
+            .limit(limit)
+        )
+        return await _paged_response(head, docs, limit, "score", offset=offset, provisional=approximate)
+
+    page_query = {"$and": [query, keyset_match("product_name", 1, cursor)]} if cursor else query
+    docs = listing_items.find(page_query).sort([("product_name", 1), ("_id", 1)])
+    if not cursor:
+        docs = docs.skip(skip)
+    return await _paged_response(head, docs.limit(limit), limit, "product_name", provisional=approximate)
+
 
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
 
+def _all_terms_search(q: str) -> str:
+    """
+    $search string requiring every word of q: bare words are ORed by $text,
+    so each is sent as its own quoted phrase (embedded quotes are dropped).
+    """
+    return " ".join(f'"{term}"' for term in q.replace('"', " ").split())
+
+
+def _partial_name_match(q: str) -> dict:
+    """Case-insensitive substring match on product_name (unindexed; fallback only)."""
+    return {"$regex": re.escape(q), "$options": "i"}
+
+
+def _cursor_offset(token: str, field: str) -> int:
+    """Offset from a cursor issued for an offset-paged ordering (e.g. relevance)."""
+    state = decode_cursor(token)
+    offset = state.get("o")
+    if state.get("f") != field or not isinstance(offset, int) or offset < 0:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return offset
+
+
+async def _paged_response(
+    head: dict, docs, limit: int, sort_field: str, offset: int | None = None, provisional: bool = False
+):
+    """
+    Encode a page of listings (streamed when large) plus the cursor for the
+    next page: keyset on (sort_field, _id), or the next offset when given one.
+    `provisional` pages (stale facets, approximate totals) are sent without
+    an ETag so clients don't keep them until the next data version.
+    """
+    headers = {"Cache-Control": PROVISIONAL_CACHE_CONTROL} if provisional else None
+    seen = {"count": 0, "last": None}
+
+    async def formatted():
+        async for doc in docs:
+            seen["count"] += 1
+            seen["last"] = doc
+            yield _format_product(doc)
+
+    def tail() -> dict:
+        last = seen["last"]
+        if seen["count"] < limit or last is None:
+            return {"nextCursor": None}
+        if offset is not None:
+            return {"nextCursor": encode_cursor({"f": sort_field, "o": offset + limit})}
+        return {"nextCursor": encode_cursor(
+            {"f": sort_field, "k": last.get(sort_field), "id": str(last["_id"])}
+        )}
+
+    if limit >= STREAM_THRESHOLD:
+        return stream_json(head, "products", formatted(), headers=headers, tail=tail)
+    products = [p async for p in formatted()]
+    return FastJSONResponse({"products": products, **head, **tail()}, headers=headers)
+
+
 def _format_product(doc: dict) -> dict:
     """Shape a MongoDB listing_items document for the frontend."""
-    price_str = doc.get("price", "0")
-    try:
-        price_val = float(price_str)
-    except (ValueError, TypeError):
-        price_val = 0
+    # Display the scraped price itself; price_num is a query copy that can lag it
+    price_val = parse_price(doc.get("price", "0"))
 
     return {
         "id": doc.get("product_id", str(doc.get("_id", ""))),
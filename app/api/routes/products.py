@@ -4,27 +4,69 @@ Adapts the existing MongoDB multi-DB product data into the shape
 expected by the React Product interface.
 """
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from datetime import datetime
 import asyncio
 import logging
 import random
 
+from app.auth import get_current_user
 from app.database import (
+    LEGACY_PRODUCT_COVERING_INDEX,
+    LEGACY_PRODUCT_ID_INDEX,
+    LEGACY_PRODUCT_KEY_PROJECTION,
+    LEGACY_PRODUCT_PROJECTION,
     PRODUCT_CATEGORIES,
+    catalogue_collection,
+    db,
     get_products_collection,
     getprice_db,
 )
 from app.utils.cache import (
+    bump_data_version,
     get_all_categories_cache,
     get_category_brands_models_cache,
 )
-from app.utils.search import search_brands_and_models, normalize_text
+from app.utils.cursors import decode_cursor, encode_cursor
+from app.utils.leaderboard import (
+    get_products_by_price,
+    get_top_deals,
+    lowest_price,
+    product_member,
+    prune_category,
+    update_product_scores,
+)
+from app.utils.price_history import get_price_history, record_price_observations
+from app.utils.related import compute_related, get_related, store_related
+from app.utils.responses import FastJSONResponse, dumps, STREAM_THRESHOLD, stream_json
+from app.utils.search import search_brands_and_models
+from app.utils.singleflight import SingleFlight
+from app.utils.search_cache import get_cached, put_cached
 from app.database import redis_client
 import json
 
-router = APIRouter(prefix="/api", tags=["products"])
+router = APIRouter(prefix="/api", tags=["products"], default_response_class=FastJSONResponse)
 logger = logging.getLogger(__name__)
 
+async def ensure_indexes():
+    """Create indexes on the category product collections (idempotent)."""
+    from pymongo.errors import OperationFailure
+
+    async def _safe_index(coll, *args, **kwargs):
+        try:
+            await coll.create_index(*args, **kwargs)
+        except OperationFailure:
+            pass  # index already exists with different options
+
+    for info in PRODUCT_CATEGORIES.values():
+        collection = info["db"][info["collection"]]
+        await _safe_index(collection, LEGACY_PRODUCT_ID_INDEX)
+        await _safe_index(collection, LEGACY_PRODUCT_COVERING_INDEX)
+        await _safe_index(collection, "site_fetched")  # distinct() for stats is index-only
+        await _safe_index(collection, "latest_price.date")  # incremental export (since=)
+
+
 # ---------------------------------------------------------------------------
 # Helpers — shape transformers
 # ---------------------------------------------------------------------------
@@ -82,20 +124,43 @@ async def _aggregate_product(
     """
     Build a full React-shaped product from all retailer listings for a brand+model.
     """
+    docs = await _fetch_listings(brand, model, category)
+    if not docs:
+        return None
+
+    return _assemble_product(brand, model, category, docs, brand_cache)
+
+
+async def _fetch_listings(brand: str, model: str, category: str) -> list[dict]:
+    """All retailer listings for a brand+model."""
     collection = await get_products_collection(category)
     if collection is None:
-        return None
+        return []
 
     cursor = collection.find({
         "brand": brand,
         "model": {"$regex": f"^{model}$", "$options": "i"},
-    })
-    docs = await cursor.to_list(length=None)
-    if not docs:
-        return None
+    }, LEGACY_PRODUCT_PROJECTION)
+    return await cursor.to_list(length=None)
 
+
+def _assemble_product(
+    brand: str,
+    model: str,
+    category: str,
+    docs: list[dict],
+    brand_cache: dict | None = None,
+) -> dict | None:
+    """
+    Shape the retailer listings of one brand+model into a React `Product`.
+    The id is the product_id of the cheapest listing that has one (listings
+    are projected without _id); None when no listing in the group has one.
+    """
     docs.sort(key=lambda d: d.get("latest_price", {}).get("amount", 0))
     cheapest = docs[0]
+    product_id = next((d["product_id"] for d in docs if d.get("product_id")), None)
+    if product_id is None:
+        return None
 
     # Build prices array
     prices = []
@@ -132,7 +197,7 @@ async def _aggregate_product(
     discount = int(round((highest - lowest) / highest * 100)) if highest > 0 and lowest < highest else 0
 
     return {
-        "id": cheapest.get("product_id", str(cheapest.get("_id", ""))),
+        "id": product_id,
         "name": f"{brand} {model}",
         "category": category,
         "brand": brand,
@@ -148,6 +213,77 @@ async def _aggregate_product(
     }
 
 
+# ---------------------------------------------------------------------------
+# Catalogue maintenance — keeps the Redis read models current
+# ---------------------------------------------------------------------------
+
+async def refresh_product_listing(
+    category: str,
+    brand: str,
+    model: str,
+    brand_cache: dict | None = None,
+) -> dict | None:
+    """
+    Re-assemble one brand+model and update every read model derived from it.
+    Hook for an ingest path to call when a product's listings change; nothing
+    in this app calls it yet, so the hourly rebuild is the only updater.
+    """
+    if brand_cache is None:
+        brand_cache = await get_category_brands_models_cache(category)
+    docs = await _fetch_listings(brand, model, category)
+    product = _assemble_product(brand, model, category, docs, brand_cache) if docs else None
+    changed = await update_product_scores(category, brand, model, product)
+    if docs:
+        await record_price_observations(category, brand, model, docs)
+    if changed:
+        await invalidate_product_details([d["product_id"] for d in docs if d.get("product_id")])
+        await bump_data_version("catalogue")
+    return product
+
+
+async def rebuild_catalogue_read_models():
+    """
+    Scheduled full rebuild: re-scores every product in the deals/price
+    leaderboards, prunes stale members, recomputes related-product lists,
+    and records a price observation for every listing.
+    """
+    all_cache = await get_all_categories_cache()
+    observed_at = datetime.utcnow()
+    changed: list[str] = []
+    for cat, brand_map in all_cache.items():
+        if not brand_map:
+            continue
+        entries: list[dict] = []
+        listing_ids: dict[str, list[str]] = {}
+
+        async def rebuild_one(b: str, m: str):
+            docs = await _fetch_listings(b, m, cat)
+            product = _assemble_product(b, m, cat, docs, brand_map) if docs else None
+            if await update_product_scores(cat, b, m, product):
+                changed.append(product_member(cat, b, m))
+                await invalidate_product_details([d["product_id"] for d in docs if d.get("product_id")])
+            if docs:
+                await record_price_observations(cat, b, m, docs, observed_at)
+            if product:
+                member = product_member(cat, b, m)
+                entries.append({"member": member, "product": product})
+                listing_ids[member] = [d["product_id"] for d in docs if d.get("product_id")]
+
+        for b, bd in brand_map.items():
+            models = [m["model"] for m in bd.get("models", [])]
+            results = await asyncio.gather(*(rebuild_one(b, m) for m in models), return_exceptions=True)
+            for m, r in zip(models, results):
+                if isinstance(r, Exception):
+                    logger.warning(f"Catalogue rebuild failed for {cat}/{b}/{m}: {r}")
+
+        await prune_category(cat, set(listing_ids))
+        await store_related(listing_ids, compute_related(entries))
+        logger.info(f"Catalogue read models rebuilt for {cat}: {len(entries)} products")
+
+    if changed:
+        await bump_data_version("catalogue")
+
+
 # ---------------------------------------------------------------------------
 # Endpoints
 # ---------------------------------------------------------------------------
@@ -156,33 +292,34 @@ async def _aggregate_product(
 async def get_featured_products(
     limit: int = Query(8, ge=1, le=50),
     sort: str = Query("random"),
+    category: str = Query(None),
 ):
     """
     Return featured/trending products across all categories.
     Used by the React HomePage component.
     sort: random | price-asc | price-desc | discount | rating
+    Price and discount sorts are served from the Redis leaderboards.
     """
-    all_cache = await get_all_categories_cache()
-    tasks = []
+    if category and category not in PRODUCT_CATEGORIES:
+        raise HTTPException(status_code=404, detail=f"Category '{category}' not found")
 
-    for cat, brand_map in all_cache.items():
-        if not brand_map:
-            continue
-        brands = list(brand_map.keys())
-        selected = random.sample(brands, min(2, len(brands)))
-        for b in selected:
-            models = brand_map[b].get("models", [])
-            if models:
-                m = random.choice(models)
-                tasks.append(_aggregate_product(b, m["model"], cat, brand_map))
+    products: list[dict] = []
+    try:
+        if sort in ("price-asc", "price-desc"):
+            products = await get_products_by_price(limit, category, descending=sort == "price-desc")
+        elif sort == "discount":
+            products = await get_top_deals(limit, category)
+    except Exception as e:
+        logger.warning(f"Leaderboard read failed, sampling instead: {e}")
+    if products:
+        return {"products": products}
 
-    results = await asyncio.gather(*tasks, return_exceptions=True)
-    products = [r for r in results if isinstance(r, dict)]
+    products = await _sample_products(category, brands_per_category=2, models_per_brand=1)
 
     if sort == "price-asc":
-        products.sort(key=lambda p: min((pr["price"] for pr in p["prices"] if pr["price"] > 0), default=0))
+        products.sort(key=lowest_price)
     elif sort == "price-desc":
-        products.sort(key=lambda p: min((pr["price"] for pr in p["prices"] if pr["price"] > 0), default=0), reverse=True)
+        products.sort(key=lowest_price, reverse=True)
     elif sort == "discount":
         products.sort(key=lambda p: p.get("discount") or 0, reverse=True)
     elif sort == "rating":
@@ -194,49 +331,69 @@ async def get_featured_products(
 
 
 @router.get("/products/deals")
-async def get_daily_deals(limit: int = Query(6, ge=1, le=50)):
+async def get_daily_deals(
+    limit: int = Query(6, ge=1, le=50),
+    category: str = Query(None),
+):
     """
     Return products with the largest price spreads (biggest savings).
     Used by the React HomePage 'Daily Deals' section.
+    Reads the discount leaderboard; samples live only until it is built.
     """
+    if category and category not in PRODUCT_CATEGORIES:
+        raise HTTPException(status_code=404, detail=f"Category '{category}' not found")
+
+    try:
+        products = await get_top_deals(limit, category)
+        if products:
+            return {"products": products}
+    except Exception as e:
+        logger.warning(f"Leaderboard read failed, sampling instead: {e}")
+
+    products = await _sample_products(category, brands_per_category=3, models_per_brand=2)
+    products = [p for p in products if p.get("discount")]
+    products.sort(key=lambda p: p.get("discount", 0), reverse=True)
+    return {"products": products[:limit]}
+
+
+async def _sample_products(category: str | None, brands_per_category: int, models_per_brand: int) -> list[dict]:
+    """Aggregate a random sample of products (cold-start fallback for the leaderboards)."""
     all_cache = await get_all_categories_cache()
     tasks = []
 
     for cat, brand_map in all_cache.items():
-        if not brand_map:
+        if not brand_map or (category and cat != category):
             continue
         brands = list(brand_map.keys())
-        selected = random.sample(brands, min(3, len(brands)))
+        selected = random.sample(brands, min(brands_per_category, len(brands)))
         for b in selected:
             models = brand_map[b].get("models", [])
-            picked = random.sample(models, min(2, len(models)))
+            picked = random.sample(models, min(models_per_brand, len(models)))
             for m in picked:
                 tasks.append(_aggregate_product(b, m["model"], cat, brand_map))
 
     results = await asyncio.gather(*tasks, return_exceptions=True)
-    products = [r for r in results if isinstance(r, dict) and r.get("discount")]
-    products.sort(key=lambda p: p.get("discount", 0), reverse=True)
-    return {"products": products[:limit]}
+    return [r for r in results if isinstance(r, dict)]
 
 
-@router.get("/products/search")
-async def search_products(
-    q: str = Query(..., min_length=1, max_length=200),
-    category: str = Query(None),
-    limit: int = Query(20, ge=1, le=100),
-):
+SEARCH_BRAND_MODEL_WEIGHT = 0.9  # models reached via a brand match rank just below direct hits
+
+
+async def _ranked_search_pairs(q: str, category: str | None) -> list[list[str]]:
     """
-    Search products across categories using the existing fuzzy search engine.
-    Used by the React SearchResultsPage.
+    Ranked [category, brand, model] matches for a query, cached per catalogue
+    version so every page of one query slices the same list.
     """
-    # Check Redis cache first
-    cache_key = f"api_search:{normalize_text(q)}:{category or 'all'}"
-    cached = await redis_client.get(cache_key)
-    if cached:
-        return json.loads(cached)
+    scope = f"api_ranked:{category or 'all'}"
+    try:
+        cached = await get_cached(scope, q)
+        if cached:
+            return json.loads(cached)
+    except Exception as e:
+        logger.warning(f"Ranked search cache read failed: {e}")
 
     categories_to_search = [category] if category and category in PRODUCT_CATEGORIES else list(PRODUCT_CATEGORIES.keys())
-    all_products = []
+    scores: dict[tuple, float] = {}
 
     for cat in categories_to_search:
         brand_cache = await get_category_brands_models_cache(cat)
@@ -245,32 +402,79 @@ async def search_products(
 
         search_results = search_brands_and_models(q, brand_cache)
 
-        # Collect brand+model pairs to fetch
-        pairs = set()
+        for mm in search_results.get("models", []):
+            key = (cat, mm["brand"].lower(), mm["model"])
+            scores[key] = max(scores.get(key, 0), mm["score"])
 
-        for bm in search_results.get("brands", [])[:5]:
-            b = bm["brand"]
-            bd = brand_cache.get(b.lower(), {})
-            for m in bd.get("models", [])[:3]:
-                pairs.add((b.lower(), m["model"]))
+        for bm in search_results.get("brands", []):
+            b = bm["brand"].lower()
+            for m in brand_cache.get(b, {}).get("models", []):
+                key = (cat, b, m["model"])
+                scores[key] = max(scores.get(key, 0), bm["score"] * SEARCH_BRAND_MODEL_WEIGHT)
 
-        for mm in search_results.get("models", [])[:5]:
-            pairs.add((mm["brand"].lower(), mm["model"]))
+    ranked = [list(k) for k, _ in sorted(scores.items(), key=lambda kv: (-kv[1], kv[0]))]
+    try:
+        await put_cached(scope, q, json.dumps(ranked), 600)
+    except Exception as e:
+        logger.warning(f"Ranked search cache write failed: {e}")
+    return ranked
 
-        tasks = [_aggregate_product(b, m, cat, brand_cache) for b, m in pairs]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        all_products.extend(r for r in results if isinstance(r, dict))
 
-    all_products = all_products[:limit]
-    response = {"products": all_products, "query": q, "count": len(all_products)}
+@router.get("/products/search")
+async def search_products(
+    q: str = Query(..., min_length=1, max_length=200),
+    category: str = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str | None = Query(None, description="Opaque cursor from a previous page's nextCursor"),
+):
+    """
+    Search products across categories using the existing fuzzy search engine.
+    Used by the React SearchResultsPage.
+    Results are ranked once per query and catalogue version; each page
+    assembles only its own slice and returns a nextCursor for the following one.
+    """
+    offset = 0
+    if cursor:
+        state = decode_cursor(cursor)
+        offset = state.get("o", 0)
+        if not isinstance(offset, int) or offset < 0:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    # Check the versioned search cache first
+    cache_scope = f"api:{category or 'all'}:{limit}:{offset}"
+    try:
+        cached = await get_cached(cache_scope, q)
+        if cached:
+            return Response(content=cached, media_type="application/json")
+    except Exception as e:
+        logger.warning(f"Search cache read failed: {e}")
+
+    ranked = await _ranked_search_pairs(q, category)
+    page = ranked[offset:offset + limit]
+
+    brand_caches = {cat: await get_category_brands_models_cache(cat) for cat in {c for c, _, _ in page}}
+    tasks = [_aggregate_product(b, m, cat, brand_caches[cat]) for cat, b, m in page]
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    products = [r for r in results if isinstance(r, dict)]
 
-    # Cache for 10 minutes
+    next_offset = offset + len(page)
+    response = {
+        "products": products,
+        "query": q,
+        "count": len(products),
+        # Every ranked match normally assembles; ones whose listings vanished are skipped
+        "total": len(ranked),
+        "totalEstimated": True,
+        "nextCursor": encode_cursor({"o": next_offset}) if next_offset < len(ranked) else None,
+    }
+
+    # Cache for 10 minutes (entries also die with the catalogue version)
     try:
-        await redis_client.setex(cache_key, 600, json.dumps(response))
-    except Exception:
-        pass
+        await put_cached(cache_scope, q, dumps(response), 600)
+    except Exception as e:
+        logger.warning(f"Search cache write failed: {e}")
 
-    return response
+    return FastJSONResponse(response)
 
 
 @router.get("/products/category/{category_id}")
@@ -308,9 +512,9 @@ async def get_category_products(
 
     # Sort
     if sort == "price-asc":
-        products.sort(key=lambda p: min((pr["price"] for pr in p["prices"] if pr["price"] > 0), default=0))
+        products.sort(key=lowest_price)
     elif sort == "price-desc":
-        products.sort(key=lambda p: min((pr["price"] for pr in p["prices"] if pr["price"] > 0), default=0), reverse=True)
+        products.sort(key=lowest_price, reverse=True)
     elif sort == "discount-desc":
         products.sort(key=lambda p: p.get("discount") or 0, reverse=True)
     elif sort == "name-asc":
@@ -322,13 +526,18 @@ async def get_category_products(
     available_brands = sorted(brands_to_load.keys())
     brand_counts = {b: len(bd.get("models", [])) for b, bd in brands_to_load.items()}
 
-    return {
-        "products": products,
+    head = {
         "brands": available_brands,
         "brandCounts": brand_counts,
         "count": total,
         "category": category_id,
     }
+    # Sorting needs every assembled product of the category in memory, so this
+    # endpoint is not memory-bounded; streaming the page only avoids encoding
+    # it into one large body.
+    if len(products) >= STREAM_THRESHOLD:
+        return stream_json(head, "products", products)
+    return FastJSONResponse({"products": products, **head})
 
 
 # ---------------------------------------------------------------------------
@@ -339,12 +548,20 @@ async def get_category_products(
 async def get_related_products(product_id: str, limit: int = Query(8, ge=1, le=30)):
     """
     Return related products (same category, same brand preferred, excluding the current product).
+    Served from the precomputed neighbour lists; scanned live only until they are built.
     """
+    try:
+        related = await get_related(product_id, limit)
+        if related is not None:
+            return {"products": related}
+    except Exception as e:
+        logger.warning(f"Related lookup failed for {product_id}: {e}")
+
     source_doc = None
     source_category = None
     for category, info in PRODUCT_CATEGORIES.items():
         collection = info["db"][info["collection"]]
-        doc = await collection.find_one({"product_id": product_id})
+        doc = await collection.find_one({"product_id": product_id}, LEGACY_PRODUCT_KEY_PROJECTION)
         if doc:
             source_doc = doc
             source_category = category
@@ -385,16 +602,46 @@ async def get_related_products(product_id: str, limit: int = Query(8, ge=1, le=3
     return {"products": products[:limit]}
 
 
-@router.get("/products/{product_id}")
-async def get_product_detail(product_id: str):
+@router.get("/products/{product_id}/price-history")
+async def get_product_price_history(
+    product_id: str,
+    days: int = Query(90, ge=1, le=1825),
+    interval: str = Query("day", pattern="^(day|week)$"),
+):
     """
-    Get full product details by product_id.
-    Searches across all category databases.
-    Used by the React ProductDetailsPage.
+    Return the product's lowest-price series, downsampled per day or week.
+    Used by the React price history chart.
     """
     for category, info in PRODUCT_CATEGORIES.items():
         collection = info["db"][info["collection"]]
-        doc = await collection.find_one({"product_id": product_id})
+        doc = await collection.find_one({"product_id": product_id}, LEGACY_PRODUCT_KEY_PROJECTION)
+        if doc:
+            history = await get_price_history(category, doc.get("brand", ""), doc.get("model", ""), days, interval)
+            return {"productId": product_id, "interval": interval, "days": days, "priceHistory": history}
+
+    raise HTTPException(status_code=404, detail="Product not found")
+
+
+PRODUCT_CACHE_KEY = "product_detail:{product_id}"
+PRODUCT_CACHE_EXPIRY = 3600
+_product_detail_flight = SingleFlight()
+
+
+async def invalidate_product_details(product_ids: list[str]):
+    """Drop cached detail responses for these listing product_ids."""
+    if not product_ids:
+        return
+    try:
+        await redis_client.delete(*(PRODUCT_CACHE_KEY.format(product_id=pid) for pid in product_ids))
+    except Exception as e:
+        logger.warning(f"Failed to invalidate product detail cache: {e}")
+
+
+async def _build_product_detail(product_id: str) -> bytes | None:
+    """Assemble and cache the encoded detail response for one product_id."""
+    for category, info in PRODUCT_CATEGORIES.items():
+        collection = info["db"][info["collection"]]
+        doc = await collection.find_one({"product_id": product_id}, LEGACY_PRODUCT_KEY_PROJECTION)
         if doc:
             brand = doc.get("brand", "")
             model = doc.get("model", "")
@@ -403,9 +650,35 @@ async def get_product_detail(product_id: str):
             if product:
                 # Override id with the exact requested id
                 product["id"] = product_id
-                return product
+                payload = dumps(product)
+                try:
+                    await redis_client.setex(PRODUCT_CACHE_KEY.format(product_id=product_id), PRODUCT_CACHE_EXPIRY, payload)
+                except Exception as e:
+                    logger.warning(f"Failed to cache product {product_id}: {e}")
+                return payload
+    return None
 
-    raise HTTPException(status_code=404, detail="Product not found")
+
+@router.get("/products/{product_id}")
+async def get_product_detail(product_id: str):
+    """
+    Get full product details by product_id.
+    Searches across all category databases.
+    Used by the React ProductDetailsPage.
+    Responses are cached per product_id until that product's listings change;
+    concurrent misses for one product_id share a single computation.
+    """
+    try:
+        cached = await redis_client.get(PRODUCT_CACHE_KEY.format(product_id=product_id))
+        if cached:
+            return Response(content=cached, media_type="application/json")
+    except Exception as e:
+        logger.warning(f"Product cache read failed for {product_id}: {e}")
+
+    payload = await _product_detail_flight.do(product_id, lambda: _build_product_detail(product_id))
+    if payload is None:
+        raise HTTPException(status_code=404, detail="Product not found")
+    return Response(content=payload, media_type="application/json")
 
 
 @router.get("/categories/list")
@@ -439,45 +712,173 @@ async def list_categories():
 
 
 # ---------------------------------------------------------------------------
-# Stats
+# Export — NDJSON stream of assembled products for partners / analytics
 # ---------------------------------------------------------------------------
 
-@router.get("/stats")
-async def get_stats():
+def _as_datetime(value) -> datetime | None:
+    """Normalise a stored price date (datetime or ISO string) for comparison."""
+    if isinstance(value, datetime):
+        return value.replace(tzinfo=None)
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00")).replace(tzinfo=None)
+        except ValueError:
+            return None
+    return None
+
+
+@router.get("/export/{category}")
+async def export_category(
+    category: str,
+    since: datetime | None = Query(None, description="Only products with a listing priced at or after this time"),
+    current_user: dict = Depends(get_current_user),
+):
     """
-    Return aggregate stats for the React frontend hero section.
-    Cached in Redis for 1 hour.
+    Stream every assembled product in a category as newline-delimited JSON.
+    Listings are read in brand index order straight from a Mongo cursor and
+    grouped per brand on (brand, lowercased model), the same grouping
+    _fetch_listings uses, so memory is bounded by the largest brand. With
+    `since`, only brands and products with a listing priced at or after that
+    time are read (indexed on latest_price.date).
     """
-    cache_key = "api_stats"
-    try:
-        cached = await redis_client.get(cache_key)
-        if cached:
-            return json.loads(cached)
-    except Exception:
-        pass
+    if category not in PRODUCT_CATEGORIES:
+        raise HTTPException(status_code=404, detail=f"Category '{category}' not found")
 
-    product_count = 0
+    collection = await get_products_collection(category)
+    brand_cache = await get_category_brands_models_cache(category)
+    since_dt = since.replace(tzinfo=None) if since else None
+    logger.info(f"Export of {category} started by {current_user.get('email')} (since={since_dt})")
+
+    def assemble(listings: list[dict]) -> bytes | None:
+        updated = max((_as_datetime(d.get("latest_price", {}).get("date")) for d in listings),
+                      key=lambda d: d or datetime.min)
+        if since_dt and (updated is None or updated < since_dt):
+            return None
+        first = listings[0]
+        product = _assemble_product(first["brand"], first["model"], category, listings, brand_cache)
+        if product is None:
+            return None
+        product["updatedAt"] = updated.isoformat() if updated else None
+        return dumps(product) + b"\n"
+
+    def group_key(doc: dict) -> tuple[str, str]:
+        return doc.get("brand", ""), doc.get("model", "").lower()
+
+    async def changed_groups() -> set[tuple[str, str]]:
+        # Dates are stored as datetimes or ISO strings; match either form
+        recent = collection.find(
+            {"$or": [
+                {"latest_price.date": {"$gte": since_dt}},
+                {"latest_price.date": {"$gte": since_dt.isoformat()}},
+            ]},
+            {"_id": 0, "brand": 1, "model": 1},
+        )
+        return {group_key(doc) async for doc in recent}
+
+    def flush(brand_groups: dict[str, list[dict]]):
+        for model_key in sorted(brand_groups):
+            line = assemble(brand_groups[model_key])
+            if line:
+                yield line
+
+    async def body():
+        query: dict = {}
+        wanted = None
+        if since_dt:
+            wanted = await changed_groups()
+            query = {"brand": {"$in": sorted({brand for brand, _ in wanted})}}
+
+        cursor = collection.find(query, LEGACY_PRODUCT_PROJECTION).sort("brand", 1).batch_size(500)
+        current_brand = None
+        brand_groups: dict[str, list[dict]] = {}
+        async for doc in cursor:
+            brand, model_key = group_key(doc)
+            if brand != current_brand:
+                for line in flush(brand_groups):
+                    yield line
+                brand_groups = {}
+                current_brand = brand
+            if wanted is None or (brand, model_key) in wanted:
+                brand_groups.setdefault(model_key, []).append(doc)
+        for line in flush(brand_groups):
+            yield line
+
+    return StreamingResponse(body(), media_type="application/x-ndjson")
+
+
+# ---------------------------------------------------------------------------
+# Stats
+# ---------------------------------------------------------------------------
+
+STATS_CACHE_KEY = "api_stats"
+STATS_DOC_ID = "catalogue"
+
+
+async def rollup_catalogue_stats() -> dict:
+    """
+    Scheduled rollup of product and retailer counts into one stats document.
+    The category collections live in separate databases, so `$unionWith`
+    cannot span them; each is rolled up with an estimated count (collection
+    metadata) plus an index-backed distinct on site_fetched.
+    """
+    categories: dict[str, dict] = {}
     retailer_set: set[str] = set()
 
     for category, info in PRODUCT_CATEGORIES.items():
         collection = info["db"][info["collection"]]
         try:
-            count = await collection.count_documents({})
-            product_count += count
+            count = await collection.estimated_document_count()
             sites = await collection.distinct("site_fetched")
-            retailer_set.update(s.split(".")[0] for s in sites if s)
-        except Exception:
-            pass
+        except Exception as e:
+            logger.warning(f"Stats rollup failed for {category}: {e}")
+            continue
+        retailers = sorted({s.split(".")[0] for s in sites if s})
+        categories[category] = {"productCount": count, "retailers": retailers}
+        retailer_set.update(retailers)
 
     result = {
-        "productCount": product_count,
+        "productCount": sum(c["productCount"] for c in categories.values()),
         "shopCount": len(retailer_set),
         "categoryCount": len(PRODUCT_CATEGORIES),
     }
+    await db["catalogue_stats"].update_one(
+        {"_id": STATS_DOC_ID},
+        {"$set": {**result, "categories": categories, "updated_at": datetime.utcnow()}},
+        upsert=True,
+    )
+    try:
+        await redis_client.setex(STATS_CACHE_KEY, 3600, json.dumps(result))
+    except Exception:
+        pass
+    return result
+
 
+@router.get("/stats")
+async def get_stats():
+    """
+    Return aggregate stats for the React frontend hero section.
+    Reads the rolled-up stats document (cached in Redis); never scans the catalogue.
+    """
     try:
-        await redis_client.setex(cache_key, 3600, json.dumps(result))
+        cached = await redis_client.get(STATS_CACHE_KEY)
+        if cached:
+            return json.loads(cached)
     except Exception:
         pass
 
+    doc = await catalogue_collection(db, "catalogue_stats").find_one(
+        {"_id": STATS_DOC_ID}, {"_id": 0, "productCount": 1, "shopCount": 1}
+    )
+    result = {
+        "productCount": doc.get("productCount", 0) if doc else 0,
+        "shopCount": doc.get("shopCount", 0) if doc else 0,
+        "categoryCount": len(PRODUCT_CATEGORIES),
+    }
+
+    if doc:
+        try:
+            await redis_client.setex(STATS_CACHE_KEY, 3600, json.dumps(result))
+        except Exception:
+            pass
+
     return result
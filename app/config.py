@@ -18,6 +18,12 @@ class Settings(BaseSettings):
     MONGO_URI: str = ""
     DB_NAME: str = "phone_products"
     
+    # Read routing for catalogue databases (legacy categories, PriceRunner,
+    # taxonomy). Auth, alerts and payments live in DB_NAME and always read
+    # from the primary. Staleness must be >= 90 (MongoDB minimum); -1 = no bound.
+    CATALOGUE_READ_PREFERENCE: str = "secondaryPreferred"
+    CATALOGUE_MAX_STALENESS_SECONDS: int = 90
+    
     # Secret keys
     PRIMARY_SECRET_KEY: str = ""  # Set in .env
     SECONDARY_SECRET_KEY: str = ""
@@ -26,6 +32,12 @@ class Settings(BaseSettings):
     REDIS_URL: str = ""
     REDIS_PASSWORD: str = ""
     
+    # In-process columnar snapshot of PriceRunner listings for browse (needs numpy)
+    PR_BROWSE_SNAPSHOT: bool = False
+    
+    # Search result cache budget (bytes of cached payloads)
+    SEARCH_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+    
     # Email settings
     BREVO_API_KEY: str = ""
     EMAIL_FROM: str = "pricemonitor@dealsonline.ninja"
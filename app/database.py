@@ -1,5 +1,6 @@
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 from pymongo import server_api
+from pymongo.read_preferences import Nearest, Primary, PrimaryPreferred, Secondary, SecondaryPreferred
 from redis.asyncio import Redis
 from app.config import settings
 from dotenv import load_dotenv
@@ -11,17 +12,52 @@ redis_url = os.getenv("REDIS_URL")
 redis_password = os.getenv("REDIS_PASSWORD", "")
 mongo_uri = os.getenv("MONGO_URI")
 
+_READ_PREFERENCE_MODES = {
+    "primary": Primary,
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest,
+}
+
+
+def make_read_preference(mode: str, max_staleness: int = -1):
+    """Read preference from a mode name (as in a connection string) and staleness bound."""
+    cls = _READ_PREFERENCE_MODES.get(mode)
+    if cls is None:
+        raise ValueError(f"Unknown read preference {mode!r}")
+    if cls is Primary:
+        return Primary()
+    return cls(max_staleness=max_staleness)
+
+
+# Writes always go to the primary; this only routes reads
+catalogue_read_preference = make_read_preference(
+    settings.CATALOGUE_READ_PREFERENCE, settings.CATALOGUE_MAX_STALENESS_SECONDS
+)
+
+
+def catalogue_db(name: str) -> AsyncIOMotorDatabase:
+    """Database handle whose reads follow the catalogue read preference."""
+    return client.get_database(name, read_preference=catalogue_read_preference)
+
+
+def catalogue_collection(database: AsyncIOMotorDatabase, name: str):
+    """Catalogue-derived collection in an otherwise primary-read database (e.g. stats rollups)."""
+    return database.get_collection(name, read_preference=catalogue_read_preference)
+
+
 # MongoDB client and database
 client: AsyncIOMotorClient = AsyncIOMotorClient(mongo_uri, serverSelectionTimeoutMS=5000)
-db: AsyncIOMotorDatabase = client[settings.DB_NAME]
-phones_db: AsyncIOMotorDatabase = client["phones_db"]
-cosmetics_db: AsyncIOMotorDatabase = client["cosmetics_db"]
-laptops_db: AsyncIOMotorDatabase = client["laptops_db"]
-shoes_db: AsyncIOMotorDatabase = client["shoes_db"]
-sound_systems_db: AsyncIOMotorDatabase = client["sound_systems_db"]
-getprice_db: AsyncIOMotorDatabase = client["getprice_db"]  # Categories and metadata
-pricerunner_db: AsyncIOMotorDatabase = client["pricerunner_db"]
-taxonomy_db: AsyncIOMotorDatabase = client["taxonomy_db"]
+db: AsyncIOMotorDatabase = client[settings.DB_NAME]  # users, alerts, payments: primary reads
+phones_db: AsyncIOMotorDatabase = catalogue_db("phones_db")
+cosmetics_db: AsyncIOMotorDatabase = catalogue_db("cosmetics_db")
+laptops_db: AsyncIOMotorDatabase = catalogue_db("laptops_db")
+shoes_db: AsyncIOMotorDatabase = catalogue_db("shoes_db")
+sound_systems_db: AsyncIOMotorDatabase = catalogue_db("sound_systems_db")
+getprice_db: AsyncIOMotorDatabase = catalogue_db("getprice_db")  # Categories and metadata
+pricerunner_db: AsyncIOMotorDatabase = catalogue_db("pricerunner_db")
+taxonomy_db: AsyncIOMotorDatabase = catalogue_db("taxonomy_db")
 
 # Product categories mapping
 PRODUCT_CATEGORIES = {
@@ -32,6 +68,25 @@ PRODUCT_CATEGORIES = {
     "sound_systems": {"db": sound_systems_db, "collection": "sound_systems"}
 }
 
+# Fields legacy product queries read. Projecting to these (and indexing them,
+# see LEGACY_PRODUCT_COVERING_INDEX) keeps reads small and index-covered.
+LEGACY_PRODUCT_FIELDS = (
+    "brand",
+    "model",
+    "latest_price.amount",
+    "latest_price.date",
+    "site_fetched",
+    "product_url",
+    "product_image",
+    "product_id",
+)
+LEGACY_PRODUCT_PROJECTION = {"_id": 0, **{f: 1 for f in LEGACY_PRODUCT_FIELDS}}
+# product_id -> brand/model resolution only needs the group key
+LEGACY_PRODUCT_KEY_PROJECTION = {"_id": 0, "brand": 1, "model": 1}
+
+LEGACY_PRODUCT_COVERING_INDEX = [(f, 1) for f in LEGACY_PRODUCT_FIELDS]
+LEGACY_PRODUCT_ID_INDEX = [("product_id", 1), ("brand", 1), ("model", 1)]
+
 # Redis client with password support
 # Note: Redis.from_url() automatically extracts credentials from the URL
 # so we don't need to pass password separately
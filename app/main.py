@@ -2,21 +2,42 @@ from fastapi import FastAPI, Request, BackgroundTasks
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import RedirectResponse
+from fastapi.responses import RedirectResponse, Response
 import logging
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 from apscheduler.triggers.cron import CronTrigger
+from datetime import datetime
 
 from app.config import settings
 from app.database import init_db, close_db
 from app.routes import home, user, favorites, price_alerts, mainpage
 from app.routes import payment, categories
-from app.api.routes.products import router as products_api_router
-from app.api.routes.pricerunner import router as pricerunner_api_router, ensure_indexes as pr_ensure_indexes
+from app.api.routes.products import (
+    router as products_api_router,
+    ensure_indexes as products_ensure_indexes,
+    rebuild_catalogue_read_models,
+    rollup_catalogue_stats,
+)
+from app.api.routes.pricerunner import (
+    router as pricerunner_api_router,
+    ensure_indexes as pr_ensure_indexes,
+    refresh_data_version as pr_refresh_data_version,
+    watch_collection_changes as pr_watch_collection_changes,
+    refresh_all_homepage_lists as pr_refresh_homepage_lists,
+    rebuild_browse_snapshot as pr_rebuild_browse_snapshot,
+)
 from app.security.key_rotation import rotate_keys
 from app.tasks.price_monitor import monitor_price_alerts
-from app.utils.cache import get_brands_models_cache
+from app.tasks.pr_related import rebuild_pr_related
+from app.tasks.pricerunner_migrations import (
+    sync_all_derived_fields as pr_sync_all_derived_fields,
+    sync_derived_fields as pr_sync_derived_fields,
+)
+from app.utils.cache import get_brands_models_cache, get_data_version
+from app.utils.http_cache import PROVISIONAL_CACHE_CONTROL, conditional_policy, etag_matches, make_etag
+from app.utils.price_history import ensure_price_history_collections
+from app.utils.search_cache import log_search_cache_info
 
 # Configure logging
 logging.basicConfig(
@@ -40,6 +61,8 @@ async def lifespan(app: FastAPI):
     # Startup: Initialize databases
     await init_db()
     await pr_ensure_indexes()
+    await products_ensure_indexes()
+    await ensure_price_history_collections()
     
     # Load cache in background (don't block startup)
     async def load_cache_background():
@@ -53,7 +76,76 @@ async def lifespan(app: FastAPI):
     # Start cache loading in background
     import asyncio
     asyncio.create_task(load_cache_background())
+
+    # Count in-place PriceRunner edits for the data-version refresh job
+    asyncio.create_task(pr_watch_collection_changes())
+
+    # Initial browse snapshot; refresh_data_version keeps it in step with the data version
+    if settings.PR_BROWSE_SNAPSHOT:
+        asyncio.create_task(pr_rebuild_browse_snapshot())
     
+    # Catalogue read models — rebuilt hourly in the background. The scraper is
+    # external and does not call refresh_product_listing(), so leaderboards and
+    # related lists can lag listing changes by up to an hour.
+    try:
+        scheduler.add_job(
+            rebuild_catalogue_read_models,
+            trigger=IntervalTrigger(hours=1),
+            id="catalogue_read_models_rebuild",
+            replace_existing=True,
+            next_run_time=datetime.now(),
+        )
+        scheduler.add_job(
+            rollup_catalogue_stats,
+            trigger=IntervalTrigger(minutes=15),
+            id="catalogue_stats_rollup",
+            replace_existing=True,
+            next_run_time=datetime.now(),
+        )
+        scheduler.add_job(
+            log_search_cache_info,
+            trigger=IntervalTrigger(minutes=15),
+            id="search_cache_stats",
+            replace_existing=True,
+        )
+        # The external scraper doesn't set derived listing fields; keep them in step
+        scheduler.add_job(
+            pr_sync_derived_fields,
+            trigger=IntervalTrigger(minutes=10),
+            id="pricerunner_derived_fields",
+            replace_existing=True,
+            next_run_time=datetime.now(),
+        )
+        scheduler.add_job(
+            pr_sync_all_derived_fields,
+            trigger=CronTrigger(hour=4, minute=0),
+            id="pricerunner_derived_fields_full",
+            replace_existing=True,
+        )
+        scheduler.add_job(
+            pr_refresh_data_version,
+            trigger=IntervalTrigger(minutes=5),
+            id="pricerunner_data_version",
+            replace_existing=True,
+            next_run_time=datetime.now(),
+        )
+        scheduler.add_job(
+            pr_refresh_homepage_lists,
+            trigger=IntervalTrigger(hours=1),
+            id="pricerunner_homepage_lists",
+            replace_existing=True,
+        )
+        scheduler.add_job(
+            rebuild_pr_related,
+            trigger=CronTrigger(hour=3, minute=30),
+            id="pricerunner_related_rebuild",
+            replace_existing=True,
+        )
+        scheduler.start()
+        logger.info("APScheduler started with catalogue maintenance jobs")
+    except Exception as e:
+        logger.error(f"Failed to start APScheduler: {e}")
+
     # Setup APScheduler for price monitoring
     #try:
     #    # Add job to run every hour (adjust the interval as needed)
@@ -72,9 +164,7 @@ async def lifespan(app: FastAPI):
     #        replace_existing=True
     #    )
     #    
-    #    # Start the scheduler
-    #    scheduler.start()
-    #    logger.info("APScheduler started with price monitoring jobs")
+    #    logger.info("Price monitoring jobs scheduled")
     #except Exception as e:
     #    logger.error(f"Failed to start APScheduler: {e}")
     
@@ -153,6 +243,30 @@ async def set_security_headers(request: Request, call_next):
     
     return response
 
+@app.middleware("http")
+async def conditional_get(request: Request, call_next):
+    """ETag / If-None-Match handling for catalogue endpoints, keyed on data versions"""
+    policy = conditional_policy(request.url.path, request.query_params) if request.method in ("GET", "HEAD") else None
+    if policy is None:
+        return await call_next(request)
+
+    namespace, cache_control = policy
+    try:
+        version = await get_data_version(namespace)
+    except Exception as e:
+        logger.warning(f"Data version unavailable, skipping ETag: {e}")
+        return await call_next(request)
+
+    etag = make_etag(namespace, version, request.url.path, request.url.query)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+
+    response = await call_next(request)
+    if response.status_code == 200 and response.headers.get("cache-control") != PROVISIONAL_CACHE_CONTROL:
+        response.headers["ETag"] = etag
+        response.headers.setdefault("Cache-Control", cache_control)
+    return response
+
 # Register routes
 
 # Health check endpoint for Render or other services
@@ -5,8 +5,9 @@ import json
 import asyncio
 import logging
 
-from app.database import redis_client, get_products_collection, PRODUCT_CATEGORIES
-from app.utils.search import search_brands_and_models, normalize_text
+from app.database import get_products_collection, PRODUCT_CATEGORIES, LEGACY_PRODUCT_PROJECTION
+from app.utils.search import search_brands_and_models
+from app.utils.search_cache import get_cached, put_cached
 from app.utils.cache import get_brands_models_cache, get_all_categories_cache, get_category_brands_models_cache
 
 router = APIRouter()
@@ -17,16 +18,14 @@ def get_templates():
 
 async def get_cached_search(query: str):
     """Get cached search results."""
-    key = f"search:{normalize_text(query)}"
-    cached_value = await redis_client.get(key)
+    cached_value = await get_cached("home", query)
     if cached_value:
         return json.loads(cached_value)
     return None
 
 async def cache_search_results(query: str, results: dict, expire_seconds: int = 3600):
     """Cache search results with expiration."""
-    key = f"search:{normalize_text(query)}"
-    await redis_client.setex(key, expire_seconds, json.dumps(results))
+    await put_cached("home", query, json.dumps(results), expire_seconds)
 
 @router.get("/category/{category}")
 async def category_page(
@@ -155,7 +154,7 @@ async def get_comparison_data(brand: str, model: str, category: str = "phones"):
     cursor = products_collection.find({
         "brand": brand,
         "model": {"$regex": f"^{model}$", "$options": "i"}
-    })
+    }, LEGACY_PRODUCT_PROJECTION)
     products = await cursor.to_list(length=None)
     if not products:
         return None
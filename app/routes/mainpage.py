@@ -4,7 +4,7 @@ import asyncio
 import logging
 import random
 
-from app.database import get_products_collection, PRODUCT_CATEGORIES
+from app.database import get_products_collection, PRODUCT_CATEGORIES, LEGACY_PRODUCT_PROJECTION
 from app.utils.cache import get_all_categories_cache, get_category_brands_models_cache
 
 router = APIRouter()
@@ -108,7 +108,7 @@ async def get_comparison_data(brand: str, model: str, category: str):
         cursor = products_collection.find({
             "brand": brand,
             "model": {"$regex": f"^{model}$", "$options": "i"}
-        })
+        }, LEGACY_PRODUCT_PROJECTION)
         products = await cursor.to_list(length=None)
         if not products:
             return None
@@ -5,7 +5,7 @@ import uuid
 import logging
 
 from app.models import PriceAlertCreate
-from app.database import db
+from app.database import db, LEGACY_PRODUCT_PROJECTION
 from app.auth import verify_token
 from app.utils.cache import get_brands_models_cache
 
@@ -24,7 +24,7 @@ async def create_price_alert(alert: PriceAlertCreate, payload: dict = Depends(ve
         raise HTTPException(status_code=401, detail="Unauthorized: User email not found in token payload")
     
     product_id = alert.product_id
-    product = await db["phones"].find_one({"product_id": product_id})
+    product = await db["phones"].find_one({"product_id": product_id}, LEGACY_PRODUCT_PROJECTION)
     if not product:
         logger.error(f"Product not found for ID {product_id}: {alert.product_id}")
         raise HTTPException(status_code=400, detail="Product not found, incorrect or missing product ID")
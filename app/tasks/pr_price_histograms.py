@@ -0,0 +1,142 @@
+"""
+Precomputed price distributions for PriceRunner browse price sliders.
+
+For every product type, and every category_url within it, the prices of
+listings with a known price are summarised into equal-width buckets and a
+few percentiles. The summaries live in one Redis hash per product type
+(field = category_url, or "*" for the whole type), so the endpoint is a
+single HGET. They are rebuilt whenever the "pricerunner" data version is
+bumped for a listing_items change, so they never lag the ETags.
+"""
+
+import json
+import logging
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+from bson import ObjectId
+
+from app.database import pricerunner_db, redis_client
+from app.utils.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+listing_items = pricerunner_db["listing_items"]
+
+PRICE_HISTOGRAM_KEY = "pr_price_histogram:{product_type}"
+ALL_CATEGORIES = "*"
+HISTOGRAM_BUCKETS = 20
+PERCENTILES = (10, 25, 50, 75, 90)
+# Buckets span min..p99 so one outlier can't squash everything into the first
+# bucket; the last bucket is stretched to the true max.
+RANGE_PERCENTILE = 99
+
+_rebuilds = SingleFlight()
+
+
+def _percentile(prices: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    rank = max(0, min(len(prices) - 1, round(pct / 100 * (len(prices) - 1))))
+    return prices[rank]
+
+
+def summarize_prices(prices: List[float]) -> Optional[Dict[str, Any]]:
+    """Histogram and percentiles for a list of positive prices (None when empty)."""
+    if not prices:
+        return None
+    prices = sorted(prices)
+    low, high = prices[0], prices[-1]
+    top = _percentile(prices, RANGE_PERCENTILE)
+    n_buckets = HISTOGRAM_BUCKETS if top > low else 1
+    width = (top - low) / n_buckets or 1.0
+
+    counts = [0] * n_buckets
+    for price in prices:
+        counts[min(int((price - low) / width), n_buckets - 1)] += 1
+
+    buckets = []
+    for i, count in enumerate(counts):
+        upper = high if i == n_buckets - 1 else low + (i + 1) * width
+        buckets.append({"from": round(low + i * width, 2), "to": round(upper, 2), "count": count})
+    return {
+        "count": len(prices),
+        "min": low,
+        "max": high,
+        "percentiles": {f"p{p}": _percentile(prices, p) for p in PERCENTILES},
+        "buckets": buckets,
+    }
+
+
+async def rebuild_price_histograms(product_type: str) -> Dict[str, Dict[str, Any]]:
+    """Recompute and store every histogram for one product type."""
+    by_category: Dict[str, List[float]] = defaultdict(list)
+    cursor = listing_items.find(
+        {"product_type": product_type, "price_num": {"$gt": 0}},
+        {"_id": 0, "category_url": 1, "price_num": 1},
+    )
+    async for doc in cursor:
+        by_category[ALL_CATEGORIES].append(doc["price_num"])
+        if doc.get("category_url"):
+            by_category[doc["category_url"]].append(doc["price_num"])
+
+    summaries = {cat: summarize_prices(prices) for cat, prices in by_category.items()}
+    summaries.setdefault(ALL_CATEGORIES, None)  # marks the type as built even with no prices
+    key = PRICE_HISTOGRAM_KEY.format(product_type=product_type)
+    pipe = redis_client.pipeline(transaction=True)
+    pipe.delete(key)
+    pipe.hset(key, mapping={cat: json.dumps(s) for cat, s in summaries.items()})
+    await pipe.execute()
+    return summaries
+
+
+async def _rebuild_types(product_types: List[str]):
+    for product_type in product_types:
+        try:
+            await _rebuilds.do(product_type, lambda pt=product_type: rebuild_price_histograms(pt))
+        except Exception as e:
+            logger.error(f"Price histogram rebuild failed for {product_type}: {e}")
+
+
+async def rebuild_all_price_histograms():
+    """Rebuild histograms for every product type present in listing_items."""
+    await _rebuild_types(await listing_items.distinct("product_type"))
+
+
+async def rebuild_price_histograms_since(last_id: Optional[ObjectId]):
+    """
+    Rebuild the product types with listings newer than `last_id` (called on a
+    listing_items data-version bump). Every type is rebuilt when `last_id` is
+    None (in-place edits) or nothing is newer (deletions).
+    """
+    product_types = await listing_items.distinct("product_type", {"_id": {"$gt": last_id}}) if last_id else []
+    if not product_types:
+        await rebuild_all_price_histograms()
+        return
+    await _rebuild_types(product_types)
+
+
+async def get_price_histogram(product_type: str, category_url: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Stored summary for a filter; builds the product type's histograms on a miss."""
+    key = PRICE_HISTOGRAM_KEY.format(product_type=product_type)
+    field = category_url or ALL_CATEGORIES
+    try:
+        raw = await redis_client.hget(key, field)
+        if raw is not None:
+            return json.loads(raw)
+        if await redis_client.exists(key):
+            return None  # built, but nothing priced under this filter
+    except Exception as e:
+        logger.warning(f"Price histograms unavailable, summarising from MongoDB: {e}")
+        return await _summarize_filter(product_type, category_url)
+    # Concurrent first requests for a type share one build
+    summaries = await _rebuilds.do(product_type, lambda: rebuild_price_histograms(product_type))
+    return summaries.get(field)
+
+
+async def _summarize_filter(product_type: str, category_url: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Summary for one filter computed directly from listing_items (nothing is stored)."""
+    query: Dict[str, Any] = {"product_type": product_type, "price_num": {"$gt": 0}}
+    if category_url:
+        query["category_url"] = category_url
+    cursor = listing_items.find(query, {"_id": 0, "price_num": 1})
+    return summarize_prices([doc["price_num"] async for doc in cursor])
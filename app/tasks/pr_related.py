@@ -0,0 +1,132 @@
+"""
+Text-similarity related products for PriceRunner listings.
+
+An offline job builds TF-IDF vectors over product_name and description for
+each category_url (sparse, L2-normalised rows), takes cosine top-k
+neighbours in row batches, and stores each product's neighbour product_ids
+in Redis, so the related endpoint is one lookup plus one $in fetch.
+
+NumPy and SciPy are optional: without them the job logs and does nothing,
+and the endpoint keeps its same-category fallback.
+"""
+
+import asyncio
+import json
+import logging
+import math
+import re
+from collections import Counter
+from typing import Any, Dict, List
+
+from app.database import pricerunner_db, redis_client
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:  # optional, only needed by the offline job
+    np = None
+    sparse = None
+
+logger = logging.getLogger(__name__)
+
+listing_items = pricerunner_db["listing_items"]
+
+PR_RELATED_KEY = "pr_related:{product_id}"
+PR_RELATED_TOP_K = 24
+PR_RELATED_EXPIRY = 3600 * 24 * 3  # outlives a missed nightly run or two
+BATCH_ROWS = 512                   # rows per similarity block (BATCH_ROWS x category size floats)
+NAME_WEIGHT = 2                    # name tokens count twice as much as description tokens
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def _tokens(doc: Dict[str, Any]) -> Counter:
+    counts = Counter()
+    for token in _TOKEN_RE.findall((doc.get("product_name") or "").lower()):
+        counts[token] += NAME_WEIGHT
+    for token in _TOKEN_RE.findall((doc.get("description") or "").lower()):
+        counts[token] += 1
+    return counts
+
+
+def _tfidf_matrix(docs: List[Dict[str, Any]]):
+    """Row-normalised sublinear TF-IDF matrix (CSR, float32)."""
+    vocab: Dict[str, int] = {}
+    rows, cols, vals = [], [], []
+    for i, doc in enumerate(docs):
+        for token, count in _tokens(doc).items():
+            rows.append(i)
+            cols.append(vocab.setdefault(token, len(vocab)))
+            vals.append(1.0 + math.log(count))
+    n = len(docs)
+    matrix = sparse.csr_matrix((vals, (rows, cols)), shape=(n, len(vocab)), dtype=np.float32)
+
+    df = np.bincount(matrix.indices, minlength=matrix.shape[1])
+    idf = (np.log((1 + n) / (1 + df)) + 1).astype(np.float32)
+    matrix = matrix @ sparse.diags(idf)
+
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return (sparse.diags(1 / norms) @ matrix).tocsr()
+
+
+def _nearest_neighbours(docs: List[Dict[str, Any]], k: int) -> Dict[str, List[str]]:
+    """product_id -> up to k most similar product_ids in the same batch of docs."""
+    n = len(docs)
+    if n < 2:
+        return {}
+    k = min(k, n - 1)
+    matrix = _tfidf_matrix(docs)
+    transposed = matrix.T.tocsc()
+    ids = [doc["product_id"] for doc in docs]
+
+    related: Dict[str, List[str]] = {}
+    for start in range(0, n, BATCH_ROWS):
+        sims = (matrix[start:start + BATCH_ROWS] @ transposed).toarray()
+        rows = np.arange(sims.shape[0])
+        sims[rows, rows + start] = -1  # never related to itself
+        top = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+        for r in rows:
+            order = top[r][np.argsort(-sims[r, top[r]])]
+            related[ids[start + r]] = [ids[j] for j in order if sims[r, j] > 0]
+    return related
+
+
+async def rebuild_pr_related():
+    """Recompute text-similarity neighbours for every category (scheduled, nightly)."""
+    if np is None:
+        logger.warning("numpy/scipy not installed; skipping PriceRunner related-products rebuild")
+        return
+
+    category_urls = await listing_items.distinct("category_url")
+    stored = 0
+    for category_url in category_urls:
+        if not category_url:
+            continue
+        try:
+            cursor = listing_items.find(
+                {"category_url": category_url, "product_id": {"$ne": None}},
+                {"_id": 0, "product_id": 1, "product_name": 1, "description": 1},
+            )
+            docs = await cursor.to_list(None)
+            related = await asyncio.to_thread(_nearest_neighbours, docs, PR_RELATED_TOP_K)
+
+            pipe = redis_client.pipeline(transaction=False)
+            for product_id, neighbours in related.items():
+                if neighbours:
+                    pipe.setex(PR_RELATED_KEY.format(product_id=product_id), PR_RELATED_EXPIRY, json.dumps(neighbours))
+            await pipe.execute()
+            stored += len(related)
+        except Exception as e:
+            logger.error(f"Related-products rebuild failed for {category_url}: {e}")
+    logger.info(f"Stored related products for {stored} PriceRunner listings")
+
+
+async def get_pr_related_ids(product_id: str) -> List[str] | None:
+    """Precomputed neighbour product_ids, or None when none are stored (or Redis is down)."""
+    try:
+        raw = await redis_client.get(PR_RELATED_KEY.format(product_id=product_id))
+    except Exception as e:
+        logger.warning(f"Related products unavailable for {product_id}: {e}")
+        return None
+    return json.loads(raw) if raw is not None else None
@@ -3,7 +3,7 @@ import logging
 from datetime import datetime
 from bson import ObjectId
 
-from app.database import db
+from app.database import db, LEGACY_PRODUCT_PROJECTION
 from app.utils.send_email import send_email  # Adjust based on your actual email utility
 from app.utils.cache import get_brands_models_cache
 logger = logging.getLogger(__name__)
@@ -11,7 +11,10 @@ logger = logging.getLogger(__name__)
 async def determine_least_product_price(brand, model):
     """Check current price of a product and return the lowest price found."""
     try:
-        cursor = db["phones"].find({"brand": brand.lower(), "model": model})
+        cursor = db["phones"].find(
+            {"brand": brand.lower(), "model": model},
+            {**LEGACY_PRODUCT_PROJECTION, "_id": 1},  # _id is reported as product_id
+        )
         products = await cursor.to_list(length=None)
         if not products:
             logger.warning(f"No products found for {brand} {model}")
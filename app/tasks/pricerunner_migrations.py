@@ -0,0 +1,135 @@
+"""
+Derived fields on pricerunner_db.listing_items.
+
+The scraper writes listings with display-oriented fields (e.g. `price` as a
+string). Query-oriented copies are derived from them so the browse endpoints
+can filter and sort on indexed fields instead of converting per document at
+query time. The scraper is external and does not set these copies, so a
+scheduled job (`sync_derived_fields()`) fills them in for listings added
+since its watermark and for listings the change stream saw edited in place.
+A nightly full pass (`sync_all_derived_fields()`) catches anything those
+miss, e.g. edits on a server without change streams.
+`derived_listing_fields()` is the same rule for an ingest path that can set
+them directly.
+"""
+
+import logging
+from typing import Any, Dict
+
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from app.database import pricerunner_db, redis_client
+
+logger = logging.getLogger(__name__)
+
+listing_items = pricerunner_db["listing_items"]
+
+SYNC_BATCH_SIZE = 1000
+SYNC_WATERMARK_KEY = "pr_derived:watermark"  # newest listing _id already synced
+SYNC_EDITED_KEY = "pr_derived:edited"        # set of listing _ids edited in place (change stream)
+SYNC_EDITED_BATCH = 10_000                   # edited ids taken per run
+
+# Punctuation stripped from the ends of the brand token ("Apple," -> "apple")
+BRAND_TRIM_CHARS = ",.:;!?()[]\"'"
+
+
+def parse_price(value: Any) -> float:
+    """Numeric price for a stored price string (0 when unparseable, as before)."""
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return 0.0
+
+
+def normalize_brand(value: Any) -> str:
+    """Brand key: first word of a product name (or a brand filter), trimmed and lowercased."""
+    words = str(value or "").split()
+    return words[0].strip(BRAND_TRIM_CHARS).lower() if words else ""
+
+
+def derived_listing_fields(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Fields the ingest path should $set alongside every listing upsert."""
+    return {
+        "price_num": parse_price(doc.get("price")),
+        "brand": normalize_brand(doc.get("product_name")),
+    }
+
+
+PRICE_NUM_EXPR = {"$convert": {"input": "$price", "to": "double", "onError": 0, "onNull": 0}}
+
+
+async def sync_price_num(scope: Dict[str, Any]) -> int:
+    """Set price_num where it is missing or no longer matches price, among listings matching `scope`."""
+    result = await listing_items.update_many(
+        {**scope, "$expr": {"$ne": ["$price_num", PRICE_NUM_EXPR]}},
+        [{"$set": {"price_num": PRICE_NUM_EXPR}}],
+    )
+    if result.modified_count:
+        logger.info(f"Synced price_num on {result.modified_count} listings")
+    return result.modified_count
+
+
+async def sync_brand(scope: Dict[str, Any]) -> int:
+    """
+    Set brand where it is missing or no longer matches product_name, among
+    listings matching `scope`. Computed in Python with normalize_brand (the
+    rule the brand filter applies), since Mongo's $toLower/$split differ on
+    non-ASCII case and runs of whitespace.
+    """
+    modified = 0
+    updates = []
+    async for doc in listing_items.find(scope, {"product_name": 1, "brand": 1}):
+        brand = normalize_brand(doc.get("product_name"))
+        if doc.get("brand") != brand:
+            updates.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"brand": brand}}))
+        if len(updates) >= SYNC_BATCH_SIZE:
+            modified += (await listing_items.bulk_write(updates, ordered=False)).modified_count
+            updates = []
+    if updates:
+        modified += (await listing_items.bulk_write(updates, ordered=False)).modified_count
+    if modified:
+        logger.info(f"Synced brand on {modified} listings")
+    return modified
+
+
+async def _sync_scope(scope: Dict[str, Any]) -> bool:
+    ok = True
+    for name, sync in (("price_num", sync_price_num), ("brand", sync_brand)):
+        try:
+            await sync(scope)
+        except Exception as e:
+            logger.error(f"listing_items {name} sync failed: {e}")
+            ok = False
+    return ok
+
+
+async def sync_derived_fields():
+    """
+    Sync derived fields on listings newer than the watermark and on those
+    edited in place since the last run (scheduled, every few minutes). Both
+    scopes are _id lookups, so the run never scans the collection.
+    """
+    watermark = await redis_client.get(SYNC_WATERMARK_KEY)
+    if not watermark:
+        await sync_all_derived_fields()
+        return
+
+    newest = await listing_items.find_one({}, {"_id": 1}, sort=[("_id", -1)])
+    edited = await redis_client.spop(SYNC_EDITED_KEY, SYNC_EDITED_BATCH) or []
+    scopes = [{"_id": {"$gt": ObjectId(watermark)}}]
+    if edited:
+        scopes.append({"_id": {"$in": [ObjectId(i) for i in edited]}})
+
+    if await _sync_scope({"$or": scopes}):
+        if newest:
+            await redis_client.set(SYNC_WATERMARK_KEY, str(newest["_id"]))
+    elif edited:
+        await redis_client.sadd(SYNC_EDITED_KEY, *edited)  # retried on the next run
+
+
+async def sync_all_derived_fields():
+    """Full pass over every listing (scheduled nightly, and when no watermark exists yet)."""
+    newest = await listing_items.find_one({}, {"_id": 1}, sort=[("_id", -1)])
+    if await _sync_scope({}) and newest:
+        await redis_client.set(SYNC_WATERMARK_KEY, str(newest["_id"]))
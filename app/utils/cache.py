@@ -1,8 +1,9 @@
 import json
 import asyncio
 import re
+import time
 from typing import Dict, Any, Optional
-from app.database import redis_client, get_brands_models_collection, get_products_collection, PRODUCT_CATEGORIES
+from app.database import redis_client, get_brands_models_collection, get_products_collection, PRODUCT_CATEGORIES, LEGACY_PRODUCT_KEY_PROJECTION
 import logging
 
 logger = logging.getLogger(__name__)
@@ -122,7 +123,7 @@ async def _build_cache_from_db(category: str = "phones") -> Dict[str, Any]:
             product_exists = await products_collection.find_one({
                 "brand": brand.lower(),
                 "model": {"$regex": f"^{escaped_model_name}$", "$options": "i"}
-            })
+            }, LEGACY_PRODUCT_KEY_PROJECTION)
             if product_exists:
                 result = {"model": model_name, "model_image": model_image}
                 # Add extra fields if they exist (for future extensibility)
@@ -188,6 +189,7 @@ async def invalidate_category_cache(category: str):
         logger.info(f"{category.capitalize()} brands models cache invalidated")
     except Exception as e:
         logger.error(f"Failed to invalidate {category} cache: {e}")
+    await bump_data_version("catalogue")
 
 async def invalidate_all_categories_cache():
     """Invalidate cache for all product categories."""
@@ -239,4 +241,34 @@ async def get_all_categories_cache_info():
     all_info = {}
     for category in PRODUCT_CATEGORIES.keys():
         all_info[category] = await get_category_cache_info(category)
-    return all_info
\ No newline at end of file
+    return all_info
+# ---------------------------------------------------------------------------
+# Data versions — bumped whenever a namespace's underlying data changes, and
+# folded into ETags and cache keys so dependent entries invalidate for free.
+# ---------------------------------------------------------------------------
+
+DATA_VERSION_KEY = "data_version:{namespace}"
+DATA_VERSION_MEMO_SECONDS = 5  # per-process memo so hot paths skip a Redis GET
+
+_data_version_memo: Dict[str, tuple] = {}
+
+async def get_data_version(namespace: str) -> int:
+    """Current version of a data namespace ("catalogue", "pricerunner")."""
+    now = time.monotonic()
+    memo = _data_version_memo.get(namespace)
+    if memo and now - memo[1] < DATA_VERSION_MEMO_SECONDS:
+        return memo[0]
+    value = await redis_client.get(DATA_VERSION_KEY.format(namespace=namespace))
+    version = int(value) if value else 0
+    _data_version_memo[namespace] = (version, now)
+    return version
+
+async def bump_data_version(namespace: str) -> int:
+    """Mark a namespace's data as changed."""
+    try:
+        version = await redis_client.incr(DATA_VERSION_KEY.format(namespace=namespace))
+        _data_version_memo[namespace] = (version, time.monotonic())
+        return version
+    except Exception as e:
+        logger.error(f"Failed to bump {namespace} data version: {e}")
+        return 0
@@ -0,0 +1,70 @@
+"""
+Bounded result counts for paginated listings.
+
+Counting a broad filter exactly costs as much as reading it, so totals are
+counted exactly only up to EXACT_COUNT_LIMIT. Beyond that the last exact
+count for the same filter (kept in Redis, stamped with the data version) is
+returned, or else the bounded lower bound (EXACT_COUNT_LIMIT + 1), flagged as
+approximate, while the exact count is recomputed in the background.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+from typing import Any, Dict, Tuple
+
+from app.database import redis_client
+from app.utils.cache import get_data_version
+from app.utils.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+EXACT_COUNT_LIMIT = 1000
+COUNT_KEY = "count_cache:{collection}:{digest}"
+COUNT_EXPIRE_SECONDS = 3600 * 6
+
+_counts = SingleFlight()
+
+
+def _count_key(coll, query: Dict[str, Any]) -> str:
+    digest = hashlib.sha1(json.dumps(query, sort_keys=True, default=str).encode()).hexdigest()
+    return COUNT_KEY.format(collection=coll.name, digest=digest)
+
+
+async def _exact_count(coll, query: Dict[str, Any], key: str, version: int) -> int:
+    total = await coll.count_documents(query)
+    await redis_client.set(key, json.dumps({"version": version, "total": total}), ex=COUNT_EXPIRE_SECONDS)
+    return total
+
+
+async def _refresh_in_background(coll, query: Dict[str, Any], key: str, version: int):
+    try:
+        await _counts.do(key, lambda: _exact_count(coll, query, key, version))
+    except Exception as e:
+        logger.error(f"Background count failed for {key}: {e}")
+
+
+async def count_matching(
+    coll,
+    query: Dict[str, Any],
+    namespace: str,
+) -> Tuple[int, bool]:
+    """Return (total, approximate) for `query` on `coll`."""
+    total = await coll.count_documents(query, limit=EXACT_COUNT_LIMIT + 1)
+    if total <= EXACT_COUNT_LIMIT:
+        return total, False
+
+    key = _count_key(coll, query)
+    try:
+        version = await get_data_version(namespace)
+        raw = await redis_client.get(key)
+    except Exception as e:
+        logger.warning(f"Count cache unavailable for {key}: {e}")
+        return total, True
+    cached = json.loads(raw) if raw else None
+    if cached and cached.get("version") == version:
+        return cached["total"], False
+
+    asyncio.create_task(_refresh_in_background(coll, query, key, version))
+    return max(cached["total"] if cached else 0, total), True
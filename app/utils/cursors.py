@@ -0,0 +1,61 @@
+"""
+Opaque pagination cursors: URL-safe base64 of a small JSON object.
+"""
+
+import base64
+import json
+from typing import Any, Dict
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException
+
+
+def encode_cursor(state: Dict[str, Any]) -> str:
+    raw = json.dumps(state, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> Dict[str, Any]:
+    """Decode a cursor, raising 400 for anything malformed."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        state = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(state, dict):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return state
+
+
+def keyset_match(field: str, direction: int, token: str) -> Dict[str, Any]:
+    """
+    $match for documents after a keyset cursor ({"f": field, "k": value,
+    "id": ObjectId hex}) in (field, _id) order; missing fields sort as null.
+    Cursors are client-supplied, so anything but a scalar key is rejected
+    rather than spliced into the query.
+    """
+    state = decode_cursor(token)
+    if state.get("f") != field:
+        raise HTTPException(status_code=400, detail="Cursor does not match the requested sort")
+    key, last_id = state.get("k"), state.get("id")
+    if isinstance(key, bool) or not isinstance(key, (str, int, float, type(None))):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(last_id, str):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    try:
+        last_id = ObjectId(last_id)
+    except InvalidId:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    op = "$gt" if direction == 1 else "$lt"
+
+    if key is None:
+        # nulls sort first ascending / last descending
+        clauses = [{field: None, "_id": {op: last_id}}]
+        if direction == 1:
+            clauses.append({field: {"$ne": None}})
+    else:
+        clauses = [{field: {op: key}}, {field: key, "_id": {op: last_id}}]
+        if direction == -1:
+            clauses.append({field: None})
+    return {"$or": clauses}
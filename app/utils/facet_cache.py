@@ -0,0 +1,93 @@
+"""
+Cached browse facets (brand counts, price range, total) for PriceRunner
+listings, keyed on (product_type, category_url, q).
+
+Entries are stamped with the "pricerunner" data version and the time they
+were computed. A stale entry (older version, or past its refresh age) is
+still served, and a single background task per key recomputes it, so facet
+counts on popular categories cost nothing at request time.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.database import redis_client
+from app.utils.cache import get_data_version
+from app.utils.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+FACET_KEY = "pr_facets:{product_type}:{category_url}:{match}:{q}"
+FACET_EXPIRE_SECONDS = 3600 * 24     # hard expiry for keys nobody asks for
+FACET_REFRESH_SECONDS = 300          # recompute in the background after this age
+
+_refreshes = SingleFlight()
+
+
+def _facet_key(product_type: str, category_url: Optional[str], q: Optional[str], match: str) -> str:
+    return FACET_KEY.format(
+        product_type=product_type,
+        category_url=category_url or "*",
+        match=match,
+        q=q.strip().lower() if q else "",  # q is matched case-insensitively
+    )
+
+
+async def _store(key: str, facets: Dict[str, Any]):
+    entry = {
+        "version": await get_data_version("pricerunner"),
+        "computed_at": time.time(),
+        "facets": facets,
+    }
+    await redis_client.set(key, json.dumps(entry), ex=FACET_EXPIRE_SECONDS)
+
+
+async def _recompute(key: str, compute: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+    facets = await compute()
+    try:
+        await _store(key, facets)
+    except Exception as e:
+        logger.warning(f"Facet cache write failed for {key}: {e}")
+    return facets
+
+
+async def _refresh_in_background(key: str, compute: Callable[[], Awaitable[Dict[str, Any]]]):
+    try:
+        await _refreshes.do(key, lambda: _recompute(key, compute))
+    except Exception as e:
+        logger.error(f"Facet refresh failed for {key}: {e}")
+
+
+async def get_facets(
+    product_type: str,
+    category_url: Optional[str],
+    q: Optional[str],
+    compute: Callable[[], Awaitable[Dict[str, Any]]],
+    match: str = "text",
+) -> Tuple[Dict[str, Any], bool]:
+    """
+    Return (facets, stale) for a browse filter set (`match` names how q was
+    applied). Misses are computed inline (coalesced per key); stale hits are
+    returned immediately, flagged, and refreshed in the background.
+    """
+    key = _facet_key(product_type, category_url, q, match)
+    try:
+        raw = await redis_client.get(key)
+        if raw is not None:
+            entry = json.loads(raw)
+            stale = (
+                entry.get("version") != await get_data_version("pricerunner")
+                or time.time() - entry.get("computed_at", 0) > FACET_REFRESH_SECONDS
+            )
+    except Exception as e:
+        logger.warning(f"Facet cache unavailable, computing from MongoDB: {e}")
+        raw = None
+    if raw is None:
+        return await _refreshes.do(key, lambda: _recompute(key, compute)), False
+
+    if stale:
+        asyncio.create_task(_refresh_in_background(key, compute))
+    return entry["facets"], stale
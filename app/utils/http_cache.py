@@ -0,0 +1,64 @@
+"""
+Conditional GET support for the catalogue JSON endpoints.
+
+ETags are derived from the data version of the namespace a path belongs to
+plus the full request URL, so they change exactly when the catalogue does and
+can be checked before the endpoint runs at all. A response built from data
+that is still being refreshed (e.g. stale cached facets) carries
+PROVISIONAL_CACHE_CONTROL instead and gets no ETag, so clients aren't pinned
+to it until the next version bump.
+"""
+
+import hashlib
+from typing import Mapping, Optional
+
+# Path prefix -> (data namespace, Cache-Control). Longest prefix wins.
+CONDITIONAL_PATHS = {
+    "/api/products/": ("catalogue", "public, max-age=60, stale-while-revalidate=300"),
+    "/api/categories/list": ("catalogue", "public, max-age=600, stale-while-revalidate=3600"),
+    "/api/pr/categories/": ("pricerunner", "public, max-age=300, stale-while-revalidate=3600"),
+    "/api/pr/": ("pricerunner", "public, max-age=60, stale-while-revalidate=300"),
+}
+
+PROVISIONAL_CACHE_CONTROL = "no-cache"
+
+
+def _varies_without_version(path: str, params: Mapping[str, str]) -> bool:
+    """Responses that change without a data-version bump and so can't be ETagged."""
+    if path.endswith("/price-history"):
+        return True  # the days window slides and new daily buckets are written
+    if path == "/api/products/featured" and params.get("sort", "random") == "random":
+        return True  # a fresh random sample per request
+    return False
+
+
+def conditional_policy(path: str, params: Optional[Mapping[str, str]] = None) -> Optional[tuple]:
+    """Return (namespace, cache_control) for a request, or None if not covered."""
+    if _varies_without_version(path, params or {}):
+        return None
+    for prefix in sorted(CONDITIONAL_PATHS, key=len, reverse=True):
+        if path.startswith(prefix):
+            return CONDITIONAL_PATHS[prefix]
+    return None
+
+
+def make_etag(namespace: str, version: int, path: str, query: str) -> str:
+    """Weak ETag for one URL at one data version."""
+    digest = hashlib.sha1(f"{namespace}:{version}:{path}?{query}".encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """RFC 7232 weak comparison against an If-None-Match header."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
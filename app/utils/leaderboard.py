@@ -0,0 +1,115 @@
+"""
+Redis sorted-set leaderboards for the legacy product catalogue.
+
+Every assembled product is stored once in a hash and scored in a per-category
+and a global sorted set (by discount and by lowest price), so the deals and
+price-sorted featured views are a ZREVRANGE/ZRANGE plus one batched HMGET.
+"""
+
+import json
+import logging
+from typing import Any, Dict, List, Optional
+
+from app.database import redis_client
+
+logger = logging.getLogger(__name__)
+
+PRODUCTS_KEY = "leaderboard:products"
+DISCOUNT_KEY = "leaderboard:discount:{scope}"
+PRICE_KEY = "leaderboard:price:{scope}"
+GLOBAL_SCOPE = "all"
+
+
+def product_member(category: str, brand: str, model: str) -> str:
+    """Stable sorted-set member for a category/brand/model group."""
+    return f"{category}:{brand.lower()}:{model.lower()}"
+
+
+def lowest_price(product: Dict[str, Any]) -> float:
+    """Lowest in-stock price of an assembled product, 0 when unknown."""
+    return min((p["price"] for p in product.get("prices", []) if p["price"] > 0), default=0)
+
+
+async def update_product_scores(category: str, brand: str, model: str, product: Optional[Dict[str, Any]]) -> bool:
+    """
+    Upsert (or remove, when product is None) one product in the leaderboards.
+    Called for every product on a full rebuild and for single products when
+    their listings change. Returns whether the stored product changed.
+    """
+    member = product_member(category, brand, model)
+    scopes = (category, GLOBAL_SCOPE)
+    encoded = json.dumps(product) if product is not None else None
+    if await redis_client.hget(PRODUCTS_KEY, member) == encoded:
+        return False
+    pipe = redis_client.pipeline(transaction=False)
+
+    if product is None:
+        pipe.hdel(PRODUCTS_KEY, member)
+        for scope in scopes:
+            pipe.zrem(DISCOUNT_KEY.format(scope=scope), member)
+            pipe.zrem(PRICE_KEY.format(scope=scope), member)
+    else:
+        discount = product.get("discount") or 0
+        price = lowest_price(product)
+        pipe.hset(PRODUCTS_KEY, member, encoded)
+        for scope in scopes:
+            if discount > 0:
+                pipe.zadd(DISCOUNT_KEY.format(scope=scope), {member: discount})
+            else:
+                pipe.zrem(DISCOUNT_KEY.format(scope=scope), member)
+            if price > 0:
+                pipe.zadd(PRICE_KEY.format(scope=scope), {member: price})
+            else:
+                pipe.zrem(PRICE_KEY.format(scope=scope), member)
+
+    await pipe.execute()
+    return True
+
+
+async def prune_category(category: str, keep: set[str]):
+    """Drop members of a category that were not seen during a full rebuild."""
+    current = set(await redis_client.zrange(PRICE_KEY.format(scope=category), 0, -1))
+    current.update(await redis_client.zrange(DISCOUNT_KEY.format(scope=category), 0, -1))
+    # Products with neither a price nor a discount are only in the hash
+    async for member, _ in redis_client.hscan_iter(PRODUCTS_KEY, match=f"{category}:*"):
+        current.add(member)
+    stale = current - keep
+    if not stale:
+        return
+
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.hdel(PRODUCTS_KEY, *stale)
+    for scope in (category, GLOBAL_SCOPE):
+        pipe.zrem(DISCOUNT_KEY.format(scope=scope), *stale)
+        pipe.zrem(PRICE_KEY.format(scope=scope), *stale)
+    await pipe.execute()
+    logger.info(f"Pruned {len(stale)} stale {category} products from leaderboards")
+
+
+async def fetch_products(members: List[str]) -> List[Dict[str, Any]]:
+    """Batched fetch of assembled products by member, preserving order."""
+    if not members:
+        return []
+    raw = await redis_client.hmget(PRODUCTS_KEY, members)
+    return [json.loads(r) for r in raw if r]
+
+
+async def get_top_deals(limit: int, category: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Products with the largest discount, best first."""
+    key = DISCOUNT_KEY.format(scope=category or GLOBAL_SCOPE)
+    members = await redis_client.zrevrange(key, 0, limit - 1)
+    return await fetch_products(members)
+
+
+async def get_products_by_price(
+    limit: int,
+    category: Optional[str] = None,
+    descending: bool = False,
+) -> List[Dict[str, Any]]:
+    """Products ordered by their lowest retailer price."""
+    key = PRICE_KEY.format(scope=category or GLOBAL_SCOPE)
+    if descending:
+        members = await redis_client.zrevrange(key, 0, limit - 1)
+    else:
+        members = await redis_client.zrange(key, 0, limit - 1)
+    return await fetch_products(members)
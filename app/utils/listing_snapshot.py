@@ -0,0 +1,231 @@
+"""
+Optional in-process columnar snapshot of pricerunner_db.listing_items for
+the browse endpoint.
+
+The handful of fields browse filters, sorts and facets on are held as NumPy
+arrays, with strings (product_type, category_url, brand) dictionary-encoded
+to integer codes, next to the pre-formatted product payloads. A browse
+request then runs as vectorized mask/sort/bincount over the arrays with no
+database round trip. The snapshot is refreshed together with the
+"pricerunner" data version (so it never serves old data under a new ETag):
+new listings (by _id watermark) are appended, and in-place edits or
+deletions trigger a full rebuild. When the snapshot is disabled, not yet
+loaded, or NumPy is missing, callers fall back to MongoDB.
+
+Memory is roughly the formatted payloads plus ~40 bytes per listing.
+"""
+
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+from bson import ObjectId
+
+from app.database import pricerunner_db
+from app.tasks.pricerunner_migrations import BRAND_TRIM_CHARS, normalize_brand, parse_price
+
+try:
+    import numpy as np
+except ImportError:  # optional, snapshot stays disabled without it
+    np = None
+
+logger = logging.getLogger(__name__)
+
+listing_items = pricerunner_db["listing_items"]
+
+SNAPSHOT_PROJECTION = {
+    "_id": 1, "product_id": 1, "product_name": 1, "description": 1, "main_image": 1,
+    "price": 1, "price_num": 1, "num_stores": 1, "category_name": 1, "category_url": 1,
+    "product_url": 1, "product_type": 1, "brand": 1,
+}
+ENCODED_FIELDS = ("product_type", "category_url", "brand")
+BRAND_FACET_LIMIT = 30
+
+
+def _append(base, values: list, dtype):
+    new = np.asarray(values, dtype=dtype)
+    return new if base is None else np.concatenate([base, new])
+
+
+class ListingSnapshot:
+    """Immutable column set; refreshes build a new instance and swap it in."""
+
+    def __init__(self):
+        self.ids: List[str] = []
+        self.rows_by_id: Dict[str, int] = {}
+        self.names: List[str] = []
+        self.payloads: List[Dict[str, Any]] = []
+        self.codes: Dict[str, Dict[str, int]] = {field: {} for field in ENCODED_FIELDS}
+        self.brand_labels: List[str] = []
+        self.columns: Dict[str, Any] = {}
+        self.name_rank = None
+        self.watermark: Optional[ObjectId] = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def build(
+        cls,
+        docs: List[Dict[str, Any]],
+        format_doc: Callable[[dict], dict],
+        base: Optional["ListingSnapshot"] = None,
+    ) -> "ListingSnapshot":
+        """New snapshot of `base` plus `docs` (which must be in ascending _id order)."""
+        snap = cls()
+        if base is not None:
+            snap.ids, snap.names, snap.payloads = list(base.ids), list(base.names), list(base.payloads)
+            snap.rows_by_id = dict(base.rows_by_id)
+            snap.codes = {field: dict(codes) for field, codes in base.codes.items()}
+            snap.brand_labels = list(base.brand_labels)
+            snap.watermark = base.watermark
+
+        new = {field: [] for field in (*ENCODED_FIELDS, "price_num", "num_stores")}
+        for doc in docs:
+            snap.rows_by_id[str(doc["_id"])] = len(snap.ids)
+            snap.ids.append(str(doc["_id"]))
+            snap.names.append(doc.get("product_name") or "")
+            snap.payloads.append(format_doc(doc))
+            for field in ("product_type", "category_url"):
+                codes = snap.codes[field]
+                new[field].append(codes.setdefault(doc.get(field) or "", len(codes)))
+
+            brand = doc.get("brand")
+            if brand is None:
+                brand = normalize_brand(doc.get("product_name"))
+            codes = snap.codes["brand"]
+            if brand not in codes:
+                codes[brand] = len(codes)
+                words = (doc.get("product_name") or "").split()
+                snap.brand_labels.append(words[0].strip(BRAND_TRIM_CHARS) if words else brand)
+            new["brand"].append(codes[brand])
+
+            price = doc.get("price_num")
+            new["price_num"].append(price if price is not None else parse_price(doc.get("price")))
+            new["num_stores"].append(doc.get("num_stores") or 0)
+            snap.watermark = doc["_id"]
+
+        previous = base.columns if base is not None else {}
+        for field in ENCODED_FIELDS:
+            snap.columns[field] = _append(previous.get(field), new[field], np.int32)
+        snap.columns["price_num"] = _append(previous.get("price_num"), new["price_num"], np.float64)
+        snap.columns["num_stores"] = _append(previous.get("num_stores"), new["num_stores"], np.int32)
+
+        # Rank of each row in (product_name, _id) order; rows are already in _id order
+        order = sorted(range(len(snap.names)), key=snap.names.__getitem__)
+        snap.name_rank = np.empty(len(order), dtype=np.int64)
+        snap.name_rank[order] = np.arange(len(order))
+        return snap
+
+    def has_listing(self, listing_id: str) -> bool:
+        return listing_id in self.rows_by_id
+
+    def _equals(self, field: str, value: str):
+        code = self.codes[field].get(value)
+        if code is None:
+            return np.zeros(len(self), dtype=bool)
+        return self.columns[field] == code
+
+    def browse(
+        self,
+        product_type: str,
+        category_url: Optional[str],
+        brand: Optional[str],
+        min_price: Optional[float],
+        max_price: Optional[float],
+        sort_field: str,
+        direction: int,
+        skip: int,
+        limit: int,
+        after: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        One browse page plus facets, matching the MongoDB path's results.
+        `after` is the listing id from a keyset cursor (see has_listing); the
+        page then starts right after that listing and `skip` is ignored.
+        """
+        price = self.columns["price_num"]
+        base_mask = self._equals("product_type", product_type)
+        if category_url:
+            base_mask &= self._equals("category_url", category_url)
+
+        mask = base_mask.copy()
+        if brand:
+            mask &= self._equals("brand", normalize_brand(brand))
+        if min_price is not None:
+            mask &= price >= min_price
+        if max_price is not None:
+            mask &= price <= max_price
+
+        rows = np.flatnonzero(mask)  # ascending row == ascending _id
+        total = int(rows.size)
+        keys = {
+            "price_num": price,
+            "num_stores": self.columns["num_stores"],
+            "product_name": self.name_rank,
+        }[sort_field]
+        key = keys[rows]
+        if after is not None:
+            # Keyset on (key, row), the same order the page itself is sorted in
+            r = self.rows_by_id[after]
+            if direction == 1:
+                beyond = (key > keys[r]) | ((key == keys[r]) & (rows > r))
+            else:
+                beyond = (key < keys[r]) | ((key == keys[r]) & (rows < r))
+            rows, key, skip = rows[beyond], key[beyond], 0
+        order = np.lexsort((rows, key)) if direction == 1 else np.lexsort((-rows, -key))
+        page_rows = rows[order[skip:skip + limit]]
+
+        counts = np.bincount(self.columns["brand"][base_mask], minlength=len(self.brand_labels))
+        blank = self.codes["brand"].get("")
+        if blank is not None:
+            counts[blank] = 0
+        top = np.argsort(-counts, kind="stable")[:BRAND_FACET_LIMIT]
+        brands = [{"name": self.brand_labels[i], "count": int(counts[i])} for i in top if counts[i] > 0]
+
+        priced = price[base_mask]
+        priced = priced[priced > 0]
+        price_range = {"min": float(priced.min()), "max": float(priced.max())} if priced.size else None
+
+        last = None
+        if len(page_rows) == limit:
+            i = int(page_rows[-1])
+            value = self.names[i] if sort_field == "product_name" else self.columns[sort_field][i].item()
+            last = {"k": value, "id": self.ids[i]}
+
+        return {
+            "total": total,
+            "brands": brands,
+            "priceRange": price_range,
+            "products": [self.payloads[int(i)] for i in page_rows],
+            "last": last,
+        }
+
+
+_snapshot: Optional[ListingSnapshot] = None
+_refresh_lock = asyncio.Lock()
+
+
+def get_listing_snapshot() -> Optional[ListingSnapshot]:
+    """Current snapshot, or None when disabled / not loaded yet."""
+    return _snapshot
+
+
+async def refresh_listing_snapshot(format_doc: Callable[[dict], dict], full: bool = False):
+    """Append listings newer than the watermark, or rebuild from scratch when `full`."""
+    global _snapshot
+    if np is None:
+        logger.warning("numpy not installed; PriceRunner browse snapshot disabled")
+        return
+
+    async with _refresh_lock:
+        base = None if full or _snapshot is None else _snapshot
+        query = {"_id": {"$gt": base.watermark}} if base is not None and base.watermark else {}
+        docs = await listing_items.find(query, SNAPSHOT_PROJECTION).sort("_id", 1).to_list(None)
+        if base is not None and not docs:
+            return
+        _snapshot = await asyncio.to_thread(ListingSnapshot.build, docs, format_doc, base)
+        logger.info(
+            f"Browse snapshot {'rebuilt' if base is None else 'extended'}: "
+            f"{len(_snapshot)} listings (+{len(docs)})"
+        )
@@ -0,0 +1,118 @@
+"""
+Price history for the legacy product catalogue.
+
+Raw observations (one per retailer listing per catalogue refresh) go into a
+MongoDB time-series collection, which stores them column-compressed per
+product/retailer bucket. Alongside, daily and weekly rollups of the product's
+lowest price are upserted on write, so a chart read is an index range scan
+over at most one document per day or week in the requested range, however
+much raw history has accumulated.
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from pymongo import UpdateOne
+from pymongo.errors import CollectionInvalid, OperationFailure
+
+from app.database import db
+
+logger = logging.getLogger(__name__)
+
+OBSERVATIONS_COLLECTION = "price_observations"
+ROLLUPS_COLLECTION = "price_history_rollups"
+OBSERVATION_RETENTION_SECONDS = 3600 * 24 * 400  # rollups are kept indefinitely
+INTERVALS = ("day", "week")
+
+price_observations = db[OBSERVATIONS_COLLECTION]
+price_history_rollups = db[ROLLUPS_COLLECTION]
+
+
+async def ensure_price_history_collections():
+    """Create the time-series collection and rollup index (idempotent)."""
+    try:
+        await db.create_collection(
+            OBSERVATIONS_COLLECTION,
+            timeseries={"timeField": "ts", "metaField": "meta", "granularity": "hours"},
+            expireAfterSeconds=OBSERVATION_RETENTION_SECONDS,
+        )
+    except (CollectionInvalid, OperationFailure):
+        pass  # already exists
+    try:
+        await price_history_rollups.create_index(
+            [("category", 1), ("brand", 1), ("model", 1), ("interval", 1), ("bucket", 1)]
+        )
+    except OperationFailure:
+        pass
+
+
+def _bucket_start(ts: datetime, interval: str) -> datetime:
+    day = ts.replace(hour=0, minute=0, second=0, microsecond=0)
+    if interval == "week":
+        return day - timedelta(days=day.weekday())
+    return day
+
+
+async def record_price_observations(
+    category: str,
+    brand: str,
+    model: str,
+    listings: List[Dict[str, Any]],
+    observed_at: Optional[datetime] = None,
+):
+    """Record the current price of each listing and fold the lowest into the rollups."""
+    ts = observed_at or datetime.utcnow()
+    brand_key, model_key = brand.lower(), model.lower()
+
+    observations = []
+    for doc in listings:
+        amount = doc.get("latest_price", {}).get("amount", 0)
+        if amount and amount > 0:
+            observations.append({
+                "ts": ts,
+                "meta": {
+                    "category": category,
+                    "brand": brand_key,
+                    "model": model_key,
+                    "retailer": doc.get("site_fetched", "unknown").split(".")[0].lower(),
+                },
+                "price": amount,
+            })
+    if not observations:
+        return
+
+    await price_observations.insert_many(observations, ordered=False)
+
+    lowest = min(o["price"] for o in observations)
+    updates = []
+    for interval in INTERVALS:
+        bucket = _bucket_start(ts, interval)
+        updates.append(UpdateOne(
+            {"category": category, "brand": brand_key, "model": model_key,
+             "interval": interval, "bucket": bucket},
+            {"$min": {"low": lowest}, "$max": {"high": lowest}, "$set": {"close": lowest}},
+            upsert=True,
+        ))
+    await price_history_rollups.bulk_write(updates, ordered=False)
+
+
+async def get_price_history(
+    category: str,
+    brand: str,
+    model: str,
+    days: int,
+    interval: str = "day",
+) -> List[Dict[str, Any]]:
+    """Downsampled lowest-price series for the last `days` days."""
+    start = _bucket_start(datetime.utcnow() - timedelta(days=days), interval)
+    cursor = price_history_rollups.find(
+        {"category": category, "brand": brand.lower(), "model": model.lower(),
+         "interval": interval, "bucket": {"$gte": start}},
+        {"_id": 0, "bucket": 1, "low": 1, "high": 1, "close": 1},
+    ).sort("bucket", 1)
+    return [
+        {"date": doc["bucket"].date().isoformat(), "price": doc["low"],
+         "high": doc.get("high"), "close": doc.get("close")}
+        async for doc in cursor
+    ]
@@ -0,0 +1,104 @@
+"""
+Precomputed related-product neighbour lists for the legacy catalogue.
+
+A background job scores every product in a category against its candidates
+(same brand, plus its neighbours in price order) on brand, price-band
+proximity and model-name token similarity, and stores the top-N leaderboard
+members per listing product_id so the endpoint is a single lookup.
+"""
+
+import heapq
+import json
+import logging
+import math
+from typing import Any, Dict, List
+
+from app.database import redis_client
+from app.utils.leaderboard import fetch_products, lowest_price
+from app.utils.search import normalize_text
+
+logger = logging.getLogger(__name__)
+
+RELATED_KEY = "related:{product_id}"
+RELATED_TOP_N = 30
+RELATED_EXPIRY = 3600 * 24  # outlives a missed rebuild or two
+PRICE_WINDOW = 50  # neighbours on each side in price order
+
+BRAND_WEIGHT = 0.4
+PRICE_WEIGHT = 0.3
+NAME_WEIGHT = 0.3
+
+
+def _name_tokens(product: Dict[str, Any]) -> set[str]:
+    name = product.get("name", "")
+    brand = product.get("brand", "").lower()
+    return {t for t in normalize_text(name).split() if t != brand}
+
+
+def _price_proximity(a: float, b: float) -> float:
+    """1.0 for equal prices, falling to 0 at a 2x price difference."""
+    if a <= 0 or b <= 0:
+        return 0.0
+    return max(0.0, 1.0 - abs(math.log(a / b)) / math.log(2))
+
+
+def compute_related(entries: List[Dict[str, Any]], top_n: int = RELATED_TOP_N) -> Dict[str, List[str]]:
+    """
+    Compute neighbour lists for one category.
+    entries: [{"member": str, "product": dict}], returns member -> [member, ...].
+    """
+    prepared = []
+    for e in entries:
+        p = e["product"]
+        prepared.append({
+            "member": e["member"],
+            "brand": p.get("brand", "").lower(),
+            "price": lowest_price(p),
+            "tokens": _name_tokens(p),
+        })
+
+    by_price = sorted(range(len(prepared)), key=lambda i: prepared[i]["price"])
+    price_rank = {idx: rank for rank, idx in enumerate(by_price)}
+    by_brand: Dict[str, List[int]] = {}
+    for i, p in enumerate(prepared):
+        by_brand.setdefault(p["brand"], []).append(i)
+
+    related: Dict[str, List[str]] = {}
+    for i, p in enumerate(prepared):
+        rank = price_rank[i]
+        candidates = set(by_price[max(0, rank - PRICE_WINDOW):rank + PRICE_WINDOW + 1])
+        candidates.update(by_brand[p["brand"]])
+        candidates.discard(i)
+
+        scored = []
+        for j in candidates:
+            q = prepared[j]
+            union = p["tokens"] | q["tokens"]
+            name_sim = len(p["tokens"] & q["tokens"]) / len(union) if union else 0.0
+            score = (
+                BRAND_WEIGHT * (p["brand"] == q["brand"])
+                + PRICE_WEIGHT * _price_proximity(p["price"], q["price"])
+                + NAME_WEIGHT * name_sim
+            )
+            scored.append((score, q["member"]))
+
+        related[p["member"]] = [m for _, m in heapq.nlargest(top_n, scored)]
+    return related
+
+
+async def store_related(listing_ids: Dict[str, List[str]], related: Dict[str, List[str]]):
+    """Store each member's neighbour list under every listing product_id of that member."""
+    pipe = redis_client.pipeline(transaction=False)
+    for member, neighbours in related.items():
+        payload = json.dumps(neighbours)
+        for product_id in listing_ids.get(member, []):
+            pipe.setex(RELATED_KEY.format(product_id=product_id), RELATED_EXPIRY, payload)
+    await pipe.execute()
+
+
+async def get_related(product_id: str, limit: int) -> List[Dict[str, Any]] | None:
+    """Return precomputed related products, or None when none are stored."""
+    raw = await redis_client.get(RELATED_KEY.format(product_id=product_id))
+    if raw is None:
+        return None
+    return await fetch_products(json.loads(raw)[:limit])
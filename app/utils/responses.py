@@ -0,0 +1,69 @@
+"""
+Response helpers for the JSON API: a fast encoder-backed response class and
+chunked streaming of large listings.
+
+orjson is used when installed; otherwise the stdlib encoder is used with
+compact separators, so behaviour is identical and only speed differs.
+"""
+
+import json
+from typing import Any, AsyncIterable, Callable, Iterable
+
+from fastapi.responses import JSONResponse, StreamingResponse
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+# Listings at or above this many items are streamed as chunked JSON
+STREAM_THRESHOLD = 50
+
+
+def dumps(obj: Any) -> bytes:
+    """Encode to compact JSON bytes (ObjectId/datetime fall back to str)."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False, default=str).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse rendered with orjson. Returning it directly from an endpoint
+    also skips FastAPI's jsonable_encoder pass over the payload.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def stream_json(
+    head: dict,
+    key: str,
+    items: Iterable[Any] | AsyncIterable[Any],
+    headers: dict | None = None,
+    tail: Callable[[], dict] | None = None,
+) -> StreamingResponse:
+    """
+    Stream `{**head, key: [items...], **tail()}` as chunked JSON, one item per
+    chunk, so the encoded body is never built in one piece. Memory is only
+    bounded when `items` is lazy (e.g. a database cursor); a list passed in is
+    of course already held in full. `tail` is called once the items are
+    exhausted (e.g. for a next-page cursor).
+    """
+    async def body():
+        prefix = dumps(head)[:-1]
+        yield prefix + (b"," if head else b"") + dumps(key) + b":["
+        first = True
+        if hasattr(items, "__aiter__"):
+            async for item in items:
+                yield (b"" if first else b",") + dumps(item)
+                first = False
+        else:
+            for item in items:
+                yield (b"" if first else b",") + dumps(item)
+                first = False
+        trailer = tail() if tail else None
+        yield b"]" + (b"," + dumps(trailer)[1:] if trailer else b"}")
+
+    return StreamingResponse(body(), media_type="application/json", headers=headers)
@@ -0,0 +1,107 @@
+"""
+Versioned, bounded Redis namespace for search results.
+
+Entry keys embed the catalogue data version, so a catalogue change orphans
+every stale entry without an explicit flush. Entry sizes and last-access times
+are tracked alongside, and the least recently used entries (orphans first,
+since nothing reads them) are evicted whenever the namespace exceeds its byte
+budget. Hits and misses are counted for the hit ratio.
+"""
+
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from app.config import settings
+from app.database import redis_client
+from app.utils.cache import get_data_version
+from app.utils.search import normalize_text
+
+logger = logging.getLogger(__name__)
+
+ENTRY_KEY = "search_cache:v{version}:{scope}:{query}"
+LRU_KEY = "search_cache:lru"        # zset: entry key -> last access time
+SIZES_KEY = "search_cache:sizes"    # hash: entry key -> payload bytes
+BYTES_KEY = "search_cache:bytes"    # total tracked payload bytes
+STATS_KEY = "search_cache:stats"    # hash: hits / misses
+EVICT_BATCH = 32
+
+
+async def _entry_key(scope: str, query: str) -> str:
+    version = await get_data_version("catalogue")
+    return ENTRY_KEY.format(version=version, scope=scope, query=normalize_text(query))
+
+
+async def get_cached(scope: str, query: str) -> Optional[str]:
+    """Return the cached JSON payload for a query, or None on a miss."""
+    key = await _entry_key(scope, query)
+    raw = await redis_client.get(key)
+    pipe = redis_client.pipeline(transaction=False)
+    if raw is not None:
+        pipe.hincrby(STATS_KEY, "hits", 1)
+        pipe.zadd(LRU_KEY, {key: time.time()})
+    else:
+        pipe.hincrby(STATS_KEY, "misses", 1)
+    await pipe.execute()
+    return raw
+
+
+async def put_cached(scope: str, query: str, payload: bytes | str, expire_seconds: int):
+    """Store a JSON payload, then evict LRU entries until within budget."""
+    key = await _entry_key(scope, query)
+    size = len(payload)
+    previous = await redis_client.hget(SIZES_KEY, key)
+
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.setex(key, expire_seconds, payload)
+    pipe.zadd(LRU_KEY, {key: time.time()})
+    pipe.hset(SIZES_KEY, key, size)
+    pipe.incrby(BYTES_KEY, size - int(previous or 0))
+    await pipe.execute()
+
+    await _evict(settings.SEARCH_CACHE_MAX_BYTES)
+
+
+async def _evict(max_bytes: int):
+    while int(await redis_client.get(BYTES_KEY) or 0) > max_bytes:
+        victims = [k for k, _ in await redis_client.zpopmin(LRU_KEY, EVICT_BATCH)]
+        if not victims:
+            await redis_client.set(BYTES_KEY, 0)  # accounting drifted; reset
+            return
+        sizes = await redis_client.hmget(SIZES_KEY, victims)
+        freed = sum(int(s or 0) for s in sizes)
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.delete(*victims)
+        pipe.hdel(SIZES_KEY, *victims)
+        pipe.decrby(BYTES_KEY, freed)
+        await pipe.execute()
+        logger.debug(f"Search cache evicted {len(victims)} entries ({freed} bytes)")
+
+
+async def get_search_cache_info() -> Dict[str, Any]:
+    """Hit ratio and size of the search cache namespace."""
+    stats = await redis_client.hgetall(STATS_KEY)
+    hits = int(stats.get("hits", 0))
+    misses = int(stats.get("misses", 0))
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": round(hits / (hits + misses), 4) if hits + misses else None,
+        "entries": await redis_client.zcard(LRU_KEY),
+        "bytes": int(await redis_client.get(BYTES_KEY) or 0),
+        "max_bytes": settings.SEARCH_CACHE_MAX_BYTES,
+        "catalogue_version": await get_data_version("catalogue"),
+    }
+
+
+async def log_search_cache_info():
+    """Log the search cache hit ratio and size for operators (scheduled)."""
+    try:
+        info = await get_search_cache_info()
+    except Exception as e:
+        logger.error(f"Failed to read search cache stats: {e}")
+        return
+    logger.info(
+        f"Search cache: hit ratio {info['hit_ratio']} ({info['hits']} hits, {info['misses']} misses), "
+        f"{info['entries']} entries, {info['bytes']}/{info['max_bytes']} bytes"
+    )
@@ -0,0 +1,23 @@
+"""
+In-process request coalescing: concurrent callers asking for the same key
+share one in-flight computation instead of each repeating it.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+
+class SingleFlight:
+    """Deduplicate concurrent async computations by key."""
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fn())
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # shield: one caller disconnecting must not cancel the shared work
+        return await asyncio.shield(future)
@@ -0,0 +1,110 @@
+"""
+Benchmark PriceRunner search strategies on a synthetic listing_items.
+
+Compares the old unanchored case-insensitive $regex on product_name with the
+text-index $text query ranked by textScore (what /api/pr/search now runs),
+timing the count plus first page for each query.
+
+Usage:
+    MONGO_URI=mongodb://localhost:27017 python others/benchmark_pr_search.py --docs 500000
+
+Writes only to the scratch database given by --db (default pricerunner_bench),
+which is dropped and regenerated unless --reuse is passed.
+"""
+
+import argparse
+import os
+import random
+import re
+import statistics
+import time
+
+from pymongo import MongoClient
+
+BRANDS = ["Samsung", "Apple", "Sony", "LG", "Philips", "Bosch", "Lenovo", "HP", "Dell", "Asus",
+          "Xiaomi", "Huawei", "Canon", "Nikon", "Garmin", "JBL", "Bose", "Dyson", "Braun", "Logitech"]
+NOUNS = ["Phone", "Laptop", "Headphones", "Speaker", "Monitor", "Camera", "Watch", "Vacuum",
+         "Blender", "Keyboard", "Mouse", "Tablet", "Router", "Drill", "Kettle", "Television"]
+WORDS = ["Pro", "Max", "Ultra", "Mini", "Plus", "Lite", "Wireless", "Portable", "Smart", "Gaming",
+         "Compact", "Premium", "Black", "White", "Silver", "Edition", "2024", "2025", "XL", "Air"]
+PRODUCT_TYPES = ["computing", "sound_vision", "phones_wearables", "home_interior", "diy", "photography"]
+
+QUERIES = ["samsung", "wireless headphones", "gaming laptop", "sony camera", "smart watch",
+           "portable speaker", "dyson vacuum", "ultra", "kettle", "apple tablet pro"]
+
+
+def generate(coll, count: int, batch: int = 10_000):
+    rng = random.Random(42)
+    for start in range(0, count, batch):
+        docs = []
+        for i in range(start, min(start + batch, count)):
+            name = " ".join([rng.choice(BRANDS), rng.choice(NOUNS), *rng.sample(WORDS, 3)])
+            docs.append({
+                "product_id": f"bench-{i}",
+                "product_name": name,
+                "description": " ".join(rng.sample(WORDS + NOUNS, 8)),
+                "product_type": rng.choice(PRODUCT_TYPES),
+                "category_url": f"/cl/{rng.randint(1, 400)}",
+                "price_num": round(rng.lognormvariate(5, 1), 2),
+                "num_stores": rng.randint(1, 30),
+            })
+        coll.insert_many(docs, ordered=False)
+    coll.create_index([("product_name", "text"), ("description", "text")])
+    coll.create_index([("product_name", 1), ("_id", 1)])
+
+
+def time_regex(coll, q: str, limit: int) -> float:
+    query = {"product_name": {"$regex": re.escape(q), "$options": "i"}}
+    started = time.perf_counter()
+    coll.count_documents(query)
+    list(coll.find(query).sort([("product_name", 1), ("_id", 1)]).limit(limit))
+    return time.perf_counter() - started
+
+
+def time_text(coll, q: str, limit: int) -> float:
+    query = {"$text": {"$search": q}}
+    started = time.perf_counter()
+    coll.count_documents(query, limit=1001)  # bounded, as count_matching does
+    list(
+        coll.find(query, {"score": {"$meta": "textScore"}})
+        .sort([("score", {"$meta": "textScore"}), ("_id", 1)])
+        .limit(limit)
+    )
+    return time.perf_counter() - started
+
+
+def summarize(label: str, samples: list[float]):
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    print(f"{label:>8}: median {statistics.median(samples) * 1000:8.1f} ms   p95 {p95 * 1000:8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=200_000)
+    parser.add_argument("--db", default="pricerunner_bench")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=24)
+    parser.add_argument("--reuse", action="store_true", help="keep existing synthetic data")
+    args = parser.parse_args()
+
+    client = MongoClient(os.getenv("MONGO_URI", "mongodb://localhost:27017"))
+    coll = client[args.db]["listing_items"]
+    if not args.reuse or coll.estimated_document_count() == 0:
+        client.drop_database(args.db)
+        print(f"Generating {args.docs} synthetic listings in {args.db}...")
+        generate(coll, args.docs)
+
+    results = {"regex": [], "text": []}
+    for _ in range(args.repeat):
+        for q in QUERIES:
+            results["regex"].append(time_regex(coll, q, args.limit))
+            results["text"].append(time_text(coll, q, args.limit))
+
+    print(f"{coll.estimated_document_count()} listings, {len(QUERIES)} queries x {args.repeat}")
+    for label, samples in results.items():
+        summarize(label, samples)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/bin/bash
+# Local three-member replica set for testing read routing
+# (CATALOGUE_READ_PREFERENCE / CATALOGUE_MAX_STALENESS_SECONDS).
+#
+# Usage: ./others/setup-local-replset.sh [start|stop|status]
+# Requires mongod and mongosh on PATH. Data lives under $BASE_DIR.
+
+REPLICA_SET_NAME="rsLocal"
+BASE_DIR="${BASE_DIR:-/tmp/mongo-rs-local}"
+PORTS=(27117 27118 27119)
+HOSTS=$(printf "localhost:%s," "${PORTS[@]}")
+MONGO_URI="mongodb://${HOSTS%,}/?replicaSet=${REPLICA_SET_NAME}"
+
+start() {
+  for port in "${PORTS[@]}"; do
+    mkdir -p "$BASE_DIR/$port"
+    mongod --replSet "$REPLICA_SET_NAME" --port "$port" --bind_ip localhost \
+      --dbpath "$BASE_DIR/$port" --logpath "$BASE_DIR/$port/mongod.log" --fork
+  done
+
+  echo "Initializing replica set..."
+  mongosh --quiet --port "${PORTS[0]}" --eval "
+    try { rs.status().ok } catch (e) {
+      rs.initiate({
+        _id: '${REPLICA_SET_NAME}',
+        members: [
+          {_id: 0, host: 'localhost:${PORTS[0]}', priority: 2},
+          {_id: 1, host: 'localhost:${PORTS[1]}', priority: 1},
+          {_id: 2, host: 'localhost:${PORTS[2]}', priority: 1}
+        ]
+      })
+    }
+  "
+
+  # Wait for a primary
+  until mongosh --quiet --port "${PORTS[0]}" --eval 'db.hello().isWritablePrimary' | grep -q true; do
+    sleep 1
+  done
+
+  echo "✅ Local replica set ready"
+  echo ""
+  echo "🔑 Point the app at it:"
+  echo "   export MONGO_URI=\"$MONGO_URI\""
+  echo ""
+  echo "🔍 Watch catalogue reads land on secondaries (run on a secondary, then hit /api/pr/...):"
+  echo "   mongosh --port ${PORTS[1]} --eval 'db.getSiblingDB(\"pricerunner_db\").setProfilingLevel(2)'"
+  echo "   mongosh --port ${PORTS[1]} --eval 'db.getSiblingDB(\"pricerunner_db\").system.profile.find().sort({ts:-1}).limit(5)'"
+}
+
+stop() {
+  for port in "${PORTS[@]}"; do
+    mongosh --quiet --port "$port" --eval 'db.getSiblingDB("admin").shutdownServer({force: true})' >/dev/null 2>&1
+  done
+  echo "Stopped local replica set"
+}
+
+status() {
+  mongosh --quiet --port "${PORTS[0]}" --eval 'rs.status().members.map(m => m.name + " " + m.stateStr).join("\n")'
+}
+
+case "${1:-start}" in
+  start) start ;;
+  stop) stop ;;
+  status) status ;;
+  *) echo "Usage: $0 [start|stop|status]"; exit 1 ;;
+esac
@@ -0,0 +1,6 @@
+import os
+
+# app.database builds its clients at import time; they connect lazily, so
+# placeholder URLs are enough for tests of the pure helpers.
+os.environ.setdefault("MONGO_URI", "mongodb://localhost:27017")
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
@@ -0,0 +1,92 @@
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+from app.utils.cursors import decode_cursor, encode_cursor, keyset_match
+
+
+def _matches(doc, clause):
+    """Evaluate the subset of query operators keyset_match emits."""
+    for field, cond in clause.items():
+        value = doc.get(field)
+        if isinstance(cond, dict):
+            for op, operand in cond.items():
+                if op == "$ne" and value == operand:
+                    return False
+                if op in ("$gt", "$lt"):
+                    if value is None or operand is None:
+                        return False
+                    if op == "$gt" and not value > operand:
+                        return False
+                    if op == "$lt" and not value < operand:
+                        return False
+        elif value != cond:
+            return False
+    return True
+
+
+def _sort_key(doc, field):
+    value = doc.get(field)
+    return (value is not None, value if value is not None else 0, doc["_id"])
+
+
+def _pages(docs, field, direction, size):
+    ordered = sorted(docs, key=lambda d: _sort_key(d, field), reverse=direction == -1)
+    seen, token = [], None
+    while True:
+        remaining = ordered
+        if token:
+            match = keyset_match(field, direction, token)
+            remaining = [d for d in ordered if any(_matches(d, c) for c in match["$or"])]
+        page = remaining[:size]
+        seen.extend(page)
+        if len(page) < size:
+            return ordered, seen
+        last = page[-1]
+        token = encode_cursor({"f": field, "k": last.get(field), "id": str(last["_id"])})
+
+
+def test_round_trip():
+    state = {"f": "price_num", "k": 12.5, "id": "65a1b2c3d4e5f60718293a4b"}
+    assert decode_cursor(encode_cursor(state)) == state
+
+
+@pytest.mark.parametrize("token", ["not base64!", encode_cursor({"a": 1})[:-2] + "!!", "WzFd"])
+def test_decode_rejects_garbage(token):
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(token)
+    assert exc.value.status_code == 400
+
+
+def test_keyset_match_ascending():
+    oid = ObjectId()
+    match = keyset_match("price_num", 1, encode_cursor({"f": "price_num", "k": 10, "id": str(oid)}))
+    assert match == {"$or": [{"price_num": {"$gt": 10}}, {"price_num": 10, "_id": {"$gt": oid}}]}
+
+
+def test_keyset_match_descending_includes_nulls():
+    oid = ObjectId()
+    match = keyset_match("num_stores", -1, encode_cursor({"f": "num_stores", "k": 3, "id": str(oid)}))
+    assert {"num_stores": None} in match["$or"]
+
+
+@pytest.mark.parametrize("state", [
+    {"f": "price_num", "k": {"$where": "1"}, "id": str(ObjectId())},
+    {"f": "price_num", "k": [1, 2], "id": str(ObjectId())},
+    {"f": "price_num", "k": True, "id": str(ObjectId())},
+    {"f": "price_num", "k": 1, "id": "nope"},
+    {"f": "price_num", "k": 1},
+    {"f": "product_name", "k": "a", "id": str(ObjectId())},
+])
+def test_keyset_match_rejects_bad_cursors(state):
+    with pytest.raises(HTTPException) as exc:
+        keyset_match("price_num", 1, encode_cursor(state))
+    assert exc.value.status_code == 400
+
+
+@pytest.mark.parametrize("direction", [1, -1])
+def test_keyset_pages_cover_everything_once_with_nulls(direction):
+    values = [5, None, 3, 5, None, 1, 3, 5, 8, None, 2]
+    docs = [{"_id": ObjectId(), "num_stores": v} for v in values]
+    ordered, seen = _pages(docs, "num_stores", direction, size=3)
+    assert [d["_id"] for d in seen] == [d["_id"] for d in ordered]
@@ -0,0 +1,159 @@
+import random
+
+import pytest
+from bson import ObjectId
+
+from app.tasks.pricerunner_migrations import normalize_brand, parse_price
+
+np = pytest.importorskip("numpy")
+
+from app.utils.listing_snapshot import ListingSnapshot  # noqa: E402
+
+SORTS = [("price_num", 1), ("price_num", -1), ("product_name", 1), ("num_stores", -1)]
+BRANDS = ["Sony", "SONY", "sony,", "Apple", "apple", "LG", "Bosch", ""]
+
+
+def _docs(count=400, seed=7):
+    rng = random.Random(seed)
+    docs = []
+    for i in range(count):
+        brand = rng.choice(BRANDS)
+        name = f"{brand} {rng.choice(['Phone', 'Speaker', 'Kettle'])} {rng.randint(1, 5)}".strip()
+        doc = {
+            "_id": ObjectId(f"{i + 1:024x}"),
+            "product_name": name,
+            "product_type": rng.choice(["computing", "sound_vision"]),
+            "category_url": rng.choice(["/cl/1", "/cl/2", "/cl/3"]),
+            "num_stores": rng.choice([None, 1, 2, 2, 5]),
+            "price": str(rng.choice([0, 9.5, 10, 10, 99, 250.25])),
+        }
+        if rng.random() < 0.8:
+            doc["price_num"] = parse_price(doc["price"])  # older rows lack the numeric copy
+        if rng.random() < 0.8:
+            doc["brand"] = normalize_brand(name)
+        docs.append(doc)
+    return docs
+
+
+def _snapshot(docs, split=250):
+    fmt = lambda doc: {"id": str(doc["_id"])}  # noqa: E731
+    base = ListingSnapshot.build(docs[:split], fmt)
+    return ListingSnapshot.build(docs[split:], fmt, base)
+
+
+def _price(doc):
+    return doc["price_num"] if doc.get("price_num") is not None else parse_price(doc.get("price"))
+
+
+def _reference(docs, product_type, category_url, brand, min_price, max_price, field, direction):
+    """What the MongoDB path returns: filter, then sort on (field, _id) in one direction."""
+    base = [d for d in docs if d["product_type"] == product_type]
+    if category_url:
+        base = [d for d in base if d["category_url"] == category_url]
+    rows = base
+    if brand:
+        rows = [d for d in rows if normalize_brand(d["product_name"]) == normalize_brand(brand)]
+    if min_price is not None:
+        rows = [d for d in rows if _price(d) >= min_price]
+    if max_price is not None:
+        rows = [d for d in rows if _price(d) <= max_price]
+
+    value = {
+        "price_num": _price,
+        "num_stores": lambda d: d.get("num_stores") or 0,
+        "product_name": lambda d: d["product_name"],
+    }[field]
+    rows = sorted(rows, key=lambda d: (value(d), d["_id"]), reverse=direction == -1)
+
+    brand_counts = {}
+    for d in base:
+        key = normalize_brand(d["product_name"])
+        if key:
+            brand_counts[key] = brand_counts.get(key, 0) + 1
+    prices = [_price(d) for d in base if _price(d) > 0]
+    price_range = {"min": min(prices), "max": max(prices)} if prices else None
+    return rows, brand_counts, price_range
+
+
+@pytest.mark.parametrize("field,direction", SORTS)
+@pytest.mark.parametrize("category_url", [None, "/cl/2"])
+@pytest.mark.parametrize("brand,min_price,max_price", [
+    (None, None, None),
+    ("sony", None, None),
+    ("APPLE", 10, None),
+    (None, 5, 100),
+    ("missing", None, None),
+])
+def test_browse_matches_sorted_reference(field, direction, category_url, brand, min_price, max_price):
+    docs = _docs()
+    snap = _snapshot(docs)
+    rows, brand_counts, price_range = _reference(
+        docs, "computing", category_url, brand, min_price, max_price, field, direction
+    )
+
+    limit = 24
+    for skip in (0, 24, len(rows) - 5):
+        skip = max(skip, 0)
+        result = snap.browse("computing", category_url, brand, min_price, max_price, field, direction, skip, limit)
+        expected = rows[skip:skip + limit]
+        assert result["total"] == len(rows)
+        assert [p["id"] for p in result["products"]] == [str(d["_id"]) for d in expected]
+        if len(expected) == limit:
+            assert result["last"]["id"] == str(expected[-1]["_id"])
+        else:
+            assert result["last"] is None
+
+    counts = {normalize_brand(b["name"]): b["count"] for b in result["brands"]}
+    assert counts == brand_counts
+    assert result["priceRange"] == price_range
+
+
+def test_extended_snapshot_equals_single_build():
+    docs = _docs()
+    fmt = lambda doc: {"id": str(doc["_id"])}  # noqa: E731
+    whole = ListingSnapshot.build(docs, fmt)
+    extended = _snapshot(docs)
+
+    assert extended.ids == whole.ids
+    assert extended.watermark == docs[-1]["_id"]
+    for field in ("price_num", "num_stores", "brand"):
+        assert np.array_equal(extended.columns[field], whole.columns[field])
+    assert np.array_equal(extended.name_rank, whole.name_rank)
+
+
+def test_unknown_filter_values_match_nothing():
+    snap = _snapshot(_docs())
+    result = snap.browse("diy", None, None, None, None, "price_num", 1, 0, 24)
+    assert result["total"] == 0
+    assert result["products"] == [] and result["brands"] == [] and result["priceRange"] is None
+
+
+@pytest.mark.parametrize("field,direction", SORTS)
+def test_cursor_pages_follow_the_sorted_reference(field, direction):
+    docs = _docs()
+    snap = _snapshot(docs)
+    rows, _, _ = _reference(docs, "computing", None, None, None, None, field, direction)
+
+    seen, after = [], None
+    while True:
+        result = snap.browse("computing", None, None, None, None, field, direction, 0, 24, after)
+        assert result["total"] == len(rows)
+        seen.extend(p["id"] for p in result["products"])
+        if result["last"] is None:
+            break
+        after = result["last"]["id"]
+    assert seen == [str(d["_id"]) for d in rows]
+
+
+def test_cursor_survives_a_rebuild_that_drops_rows():
+    docs = _docs()
+    first = _snapshot(docs).browse("computing", None, None, None, None, "price_num", 1, 0, 24)
+    after = first["last"]["id"]
+
+    # A full rebuild without some listings renumbers rows; the cursor still resumes by id
+    kept = [d for i, d in enumerate(docs) if i % 7 or str(d["_id"]) == after]
+    snap = ListingSnapshot.build(kept, lambda doc: {"id": str(doc["_id"])})
+    rows, _, _ = _reference(kept, "computing", None, None, None, None, "price_num", 1)
+    position = [str(d["_id"]) for d in rows].index(after)
+    page = snap.browse("computing", None, None, None, None, "price_num", 1, 0, 24, after)
+    assert [p["id"] for p in page["products"]] == [str(d["_id"]) for d in rows[position + 1:position + 25]]
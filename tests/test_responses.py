@@ -0,0 +1,42 @@
+import asyncio
+import json
+
+from app.utils.responses import dumps, stream_json
+
+
+def _collect(response) -> dict:
+    async def read():
+        return b"".join([chunk async for chunk in response.body_iterator])
+    return json.loads(asyncio.run(read()))
+
+
+def test_dumps_is_compact_and_stringifies_unknown_types():
+    class Opaque:
+        def __str__(self):
+            return "opaque"
+    assert dumps({"a": [1, 2], "b": Opaque()}) == b'{"a":[1,2],"b":"opaque"}'
+
+
+def test_stream_json_list_with_head_and_tail():
+    response = stream_json({"total": 2}, "products", [{"id": 1}, {"id": 2}], tail=lambda: {"next": "x"})
+    assert _collect(response) == {"total": 2, "products": [{"id": 1}, {"id": 2}], "next": "x"}
+
+
+def test_stream_json_empty_head_and_items():
+    assert _collect(stream_json({}, "products", [])) == {"products": []}
+
+
+def test_stream_json_async_items_and_tail_sees_consumed_state():
+    seen = []
+
+    async def items():
+        for i in range(3):
+            seen.append(i)
+            yield {"i": i}
+
+    response = stream_json({"q": "x"}, "items", items(), tail=lambda: {"count": len(seen)})
+    assert _collect(response) == {"q": "x", "items": [{"i": 0}, {"i": 1}, {"i": 2}], "count": 3}
+
+
+def test_stream_json_empty_tail_closes_object():
+    assert _collect(stream_json({"a": 1}, "items", [1], tail=lambda: {})) == {"a": 1, "items": [1]}